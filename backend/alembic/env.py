@@ -10,8 +10,18 @@ from alembic import context
 
 from app.core.config import get_settings
 from app.db.base import Base
+from app.db.session import driver_connect_args
 # Import all models here so Alembic can detect them
-from app.models import Arena, Image, Team, User, Visit  # noqa: F401
+from app.models import (  # noqa: F401
+  Arena,
+  Image,
+  Team,
+  User,
+  UserArenaVisitCount,
+  UserTeamVisitCount,
+  UserVisitStats,
+  Visit,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -43,6 +53,8 @@ def run_migrations_online() -> None:
     config.get_section(config.config_ini_section, {}),
     prefix="sqlalchemy.",
     poolclass=pool.NullPool,
+    # Same driver options as the app: no named prepared statements under DB_PGBOUNCER_MODE
+    connect_args=driver_connect_args(settings),
   )
 
   with connectable.connect() as connection:
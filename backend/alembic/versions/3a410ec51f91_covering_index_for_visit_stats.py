@@ -0,0 +1,37 @@
+"""
+Revision ID: 3a410ec51f91
+Revises: c5fdb2dcc4cd
+Create Date: 2026-10-17 14:03:27.551904
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3a410ec51f91'
+down_revision: Union[str, None] = 'c5fdb2dcc4cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stats are now one pass over the user's visits reading all three ids, so a
+    # single covering index replaces the per-column ones (index-only scan).
+    op.create_index(
+        'ix_visits_user_id_stats',
+        'visits',
+        ['user_id'],
+        unique=False,
+        postgresql_include=['home_team_id', 'away_team_id', 'arena_id'],
+    )
+    op.drop_index('ix_visits_user_id_arena_id', table_name='visits')
+    op.drop_index('ix_visits_user_id_away_team_id', table_name='visits')
+    op.drop_index('ix_visits_user_id_home_team_id', table_name='visits')
+
+
+def downgrade() -> None:
+    op.create_index('ix_visits_user_id_home_team_id', 'visits', ['user_id', 'home_team_id'], unique=False)
+    op.create_index('ix_visits_user_id_away_team_id', 'visits', ['user_id', 'away_team_id'], unique=False)
+    op.create_index('ix_visits_user_id_arena_id', 'visits', ['user_id', 'arena_id'], unique=False)
+    op.drop_index('ix_visits_user_id_stats', table_name='visits')
@@ -0,0 +1,40 @@
+"""
+Revision ID: c5fdb2dcc4cd
+Revises: 420c650723d1
+Create Date: 2026-10-17 09:12:41.208315
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5fdb2dcc4cd'
+down_revision: Union[str, None] = '420c650723d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Visit list / latest visit: filter by user, already in visit_date DESC order,
+    # id as a stable tiebreak. Supersedes the single-column user_id index.
+    op.create_index(
+        'ix_visits_user_id_visit_date_id',
+        'visits',
+        ['user_id', sa.text('visit_date DESC'), 'id'],
+        unique=False,
+    )
+    op.drop_index(op.f('ix_visits_user_id'), table_name='visits')
+    # Stats distinct counts: index-only scans over one user's team and arena ids.
+    op.create_index('ix_visits_user_id_home_team_id', 'visits', ['user_id', 'home_team_id'], unique=False)
+    op.create_index('ix_visits_user_id_away_team_id', 'visits', ['user_id', 'away_team_id'], unique=False)
+    op.create_index('ix_visits_user_id_arena_id', 'visits', ['user_id', 'arena_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visits_user_id_arena_id', table_name='visits')
+    op.drop_index('ix_visits_user_id_away_team_id', table_name='visits')
+    op.drop_index('ix_visits_user_id_home_team_id', table_name='visits')
+    op.create_index(op.f('ix_visits_user_id'), 'visits', ['user_id'], unique=False)
+    op.drop_index('ix_visits_user_id_visit_date_id', table_name='visits')
@@ -0,0 +1,89 @@
+"""
+Revision ID: fe5dfa8e06e1
+Revises: 3a410ec51f91
+Create Date: 2026-10-18 10:21:09.310744
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe5dfa8e06e1'
+down_revision: Union[str, None] = '3a410ec51f91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_visit_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total_visits', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('teams_seen', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('arenas_visited', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_team_visit_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('team_id', sa.UUID(), nullable=False),
+    sa.Column('visits', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'team_id')
+    )
+    op.create_table('user_arena_visit_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('arena_id', sa.UUID(), nullable=False),
+    sa.Column('visits', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['arena_id'], ['arenas.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'arena_id')
+    )
+
+    # Backfill from existing visits (same result as python -m app.scripts.rebuild_visit_stats).
+    op.execute(
+        """
+        INSERT INTO user_team_visit_counts (user_id, team_id, visits)
+        SELECT v.user_id, t.team_id, count(*)
+        FROM visits v
+        CROSS JOIN LATERAL unnest(ARRAY[v.home_team_id, v.away_team_id]) AS t(team_id)
+        GROUP BY v.user_id, t.team_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_arena_visit_counts (user_id, arena_id, visits)
+        SELECT user_id, arena_id, count(*) FROM visits GROUP BY user_id, arena_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_visit_stats (user_id, total_visits, teams_seen, arenas_visited)
+        SELECT v.user_id,
+               count(*),
+               (SELECT count(*) FROM user_team_visit_counts t WHERE t.user_id = v.user_id),
+               (SELECT count(*) FROM user_arena_visit_counts a WHERE a.user_id = v.user_id)
+        FROM visits v
+        GROUP BY v.user_id
+        """
+    )
+
+    # Stats are read from the tables above now; only the drift check and rebuild
+    # still scan visits, which ix_visits_user_id_visit_date_id serves well enough.
+    op.drop_index('ix_visits_user_id_stats', table_name='visits')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_visits_user_id_stats',
+        'visits',
+        ['user_id'],
+        unique=False,
+        postgresql_include=['home_team_id', 'away_team_id', 'arena_id'],
+    )
+    op.drop_table('user_arena_visit_counts')
+    op.drop_table('user_team_visit_counts')
+    op.drop_table('user_visit_stats')
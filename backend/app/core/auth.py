@@ -1,27 +1,54 @@
 """Authentication dependencies and utilities for FastAPI."""
 
+import uuid
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.exceptions import UnauthorizedError
-from app.core.firebase import verify_firebase_token
+from app.core.firebase import verify_firebase_token_async
+from app.core.session_tokens import is_session_token, verify_session_token
 
 # HTTP Bearer token scheme for extracting Authorization header
 security = HTTPBearer()
 
 
 class FirebaseUser:
-    """Represents an authenticated Firebase user."""
+    """
+    Represents an authenticated Firebase user.
+
+    ``app_user_id``/``app_user_created_at`` are only set when the request used a
+    backend session token, which already identifies the internal user row (see
+    :meth:`from_session_token_claims`). They are never read from the claims
+    passed to the constructor, so a Firebase custom claim cannot supply them.
+    """
     
-    def __init__(self, decoded_token: dict):
+    def __init__(
+        self,
+        decoded_token: dict,
+        *,
+        app_user_id: uuid.UUID | None = None,
+        app_user_created_at: datetime | None = None,
+    ):
         self.uid: str = decoded_token.get("uid", "")
         self.email: str | None = decoded_token.get("email")
         self.email_verified: bool = decoded_token.get("email_verified", False)
         self.name: str | None = decoded_token.get("name")
         self.picture: str | None = decoded_token.get("picture")
+        self.app_user_id: uuid.UUID | None = app_user_id
+        self.app_user_created_at: datetime | None = app_user_created_at
         self.firebase_claims: dict = decoded_token
+
+    @classmethod
+    def from_session_token_claims(cls, claims: dict) -> "FirebaseUser":
+        """User from verified backend session token claims, with the internal user id."""
+        return cls(
+            claims,
+            app_user_id=uuid.UUID(claims["app_user_id"]),
+            app_user_created_at=claims.get("app_user_created_at"),
+        )
     
     def __repr__(self) -> str:
         return f"FirebaseUser(uid={self.uid}, email={self.email})"
@@ -38,6 +65,9 @@ async def get_current_user(
         async def protected_route(user: FirebaseUser = Depends(get_current_user)):
             return {"message": f"Hello {user.email}"}
     
+    Accepts a Firebase ID token or, when enabled, a backend session token
+    (verified with a symmetric HMAC check; see ``app.core.session_tokens``).
+
     Args:
         credentials: HTTP Bearer credentials from the Authorization header.
         
@@ -50,8 +80,9 @@ async def get_current_user(
     token = credentials.credentials
     
     try:
-        decoded_token = verify_firebase_token(token)
-        return FirebaseUser(decoded_token)
+        if is_session_token(token):
+            return FirebaseUser.from_session_token_claims(verify_session_token(token))
+        return FirebaseUser(await verify_firebase_token_async(token))
     except Exception as e:
         raise UnauthorizedError(
             detail=f"Invalid authentication credentials: {str(e)}",
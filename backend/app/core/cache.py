@@ -0,0 +1,90 @@
+"""Bounded in-process caches with per-entry expiry."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time counters for a :class:`TTLCache`."""
+
+    hits: int
+    misses: int
+    size: int
+    max_entries: int
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU cache where every entry carries its own absolute expiry time.
+
+    Meant to be used from the event loop thread only (no locking). ``clock`` decides
+    the time base for ``expires_at``; pass ``time.time`` when expiries come from
+    wall-clock values such as a JWT ``exp`` claim.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        """Return a live entry (marking it most recently used) or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, expires_at: float) -> None:
+        """Store a value until ``expires_at``, evicting the least recently used entry if full."""
+        if self.max_entries <= 0 or expires_at <= self._clock():
+            return
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Drop one entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,5 +1,8 @@
+from dataclasses import dataclass, replace
 from functools import lru_cache
 
+from typing import Literal
+
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,6 +18,47 @@ def normalize_database_url(url: str) -> str:
   return url
 
 
+@dataclass(frozen=True)
+class PoolProfile:
+  """SQLAlchemy connection pool sizing for one kind of deployment (per worker)."""
+
+  pool_size: int
+  max_overflow: int
+  pool_timeout: float
+  pool_recycle: int
+  pool_pre_ping: bool
+
+
+# Sizes are per uvicorn worker: total connections = workers * (pool_size + max_overflow).
+POOL_PROFILES: dict[str, PoolProfile] = {
+  # Local development: small pool, generous wait, pre-ping survives DB restarts.
+  "dev": PoolProfile(
+    pool_size=5,
+    max_overflow=5,
+    pool_timeout=30.0,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+  ),
+  # Single small instance / hobby Postgres with a low max_connections.
+  "small": PoolProfile(
+    pool_size=5,
+    max_overflow=5,
+    pool_timeout=10.0,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+  ),
+  # Several workers behind a load balancer: bigger pool, fail fast when saturated, and
+  # recycle instead of pre-pinging so checkouts skip the extra round trip.
+  "large": PoolProfile(
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=5.0,
+    pool_recycle=600,
+    pool_pre_ping=False,
+  ),
+}
+
+
 class Settings(BaseSettings):
   """Application settings loaded from environment variables."""
 
@@ -34,6 +78,24 @@ class Settings(BaseSettings):
   postgres_db: str = Field(default="nhl_arenas")
   postgres_host: str = Field(default="localhost")
   postgres_port: int = Field(default=5432)
+
+  # Connection pool: a named profile (see POOL_PROFILES), optionally overridden per field
+  db_pool_profile: Literal["dev", "small", "large"] = Field(default="dev")
+  db_pool_size: int | None = Field(default=None, ge=1)
+  db_max_overflow: int | None = Field(default=None, ge=0)
+  db_pool_timeout_seconds: float | None = Field(default=None, gt=0)
+  db_pool_recycle_seconds: int | None = Field(default=None, ge=-1)
+  db_pool_pre_ping: bool | None = Field(default=None)
+  # psycopg server-side prepared statements: a query is prepared on a connection after
+  # it has run this many times there; at most db_prepared_max are kept per connection.
+  db_prepared_statements: bool = Field(default=True)
+  db_prepare_threshold: int = Field(default=2, ge=0)
+  db_prepared_max: int = Field(default=100, ge=1)
+  # Behind a transaction-mode pooler (PgBouncer, Supabase's transaction pooler on :6543):
+  # no named prepared statements and no session-level state. db_null_pool additionally
+  # drops the in-process pool so every session gets a fresh pooler connection.
+  db_pgbouncer_mode: bool = Field(default=False)
+  db_null_pool: bool = Field(default=False)
   
   # Firebase configuration
   firebase_project_id: str = Field(default="")
@@ -42,7 +104,65 @@ class Settings(BaseSettings):
   google_application_credentials: str | None = Field(default=None)
   # Alternative: base64-encoded service account JSON (for cloud platforms that don't support file mounts)
   firebase_service_account_base64: str | None = Field(default=None)
+  # ID token verification: "local" checks tokens in-process against cached Google
+  # signing keys; "admin" delegates to firebase_admin on a thread pool.
+  firebase_token_verifier: Literal["local", "admin"] = Field(default="local")
+  # Endpoint overrides for pointing at a local stand-in (tests/fakes/firebase.py).
+  # Unset means Google's production endpoints.
+  firebase_certs_url: str | None = Field(default=None)
+  firebase_auth_base_url: str | None = Field(default=None)
+  firebase_securetoken_base_url: str | None = Field(default=None)
+  # Refresh signing keys this many seconds before their Cache-Control max-age runs out
+  firebase_keys_refresh_margin_seconds: int = Field(default=300, ge=0)
+  # Keep serving the last signing keys this long past expiry while refreshes fail
+  firebase_keys_stale_grace_seconds: int = Field(default=3600, ge=0)
+  firebase_token_clock_skew_seconds: int = Field(default=0, ge=0, le=60)
+  # Max concurrent admin-SDK verifications (run off the event loop in a thread pool)
+  firebase_verify_max_workers: int = Field(default=4, ge=1)
+  # Verified-token cache: entries live until the token's exp or this TTL, whichever is
+  # sooner. Set max entries to 0 to disable.
+  firebase_token_cache_max_entries: int = Field(default=10_000, ge=0)
+  firebase_token_cache_ttl_seconds: int = Field(default=3600, ge=0)
   
+  # Backend-issued session tokens (HS256). Keys are "kid:secret" pairs, comma-separated;
+  # the first pair signs, all pairs verify. Bump the version to revoke issued tokens.
+  session_tokens_enabled: bool = Field(default=False)
+  session_token_keys: str = Field(default="")
+  session_token_ttl_seconds: int = Field(default=900, ge=60)
+  session_token_version: int = Field(default=1, ge=1)
+
+  # Shared outbound HTTP client (Firebase Identity Toolkit, Google signing keys)
+  http_client_max_connections: int = Field(default=20, ge=1)
+  http_client_max_keepalive_connections: int = Field(default=10, ge=0)
+  http_client_keepalive_expiry_seconds: float = Field(default=60.0, ge=0)
+  http_client_timeout_seconds: float = Field(default=10.0, gt=0)
+  http_client_connect_timeout_seconds: float = Field(default=5.0, gt=0)
+  # Requires the optional 'h2' package (pip install -e ".[http2]")
+  http_client_http2: bool = Field(default=False)
+
+  # Firebase uid -> internal user cache used by authenticated endpoints (0 disables)
+  user_identity_cache_max_entries: int = Field(default=10_000, ge=0)
+  user_identity_cache_ttl_seconds: int = Field(default=300, ge=0)
+  # Queue Firebase profile-claim changes (email/name/picture) and write them in batches
+  # every interval instead of on the request path. Login/register still sync inline.
+  profile_sync_deferred: bool = Field(default=True)
+  profile_sync_interval_seconds: float = Field(default=5.0, gt=0)
+  # Teams/arenas used to build visit responses are held in memory and reloaded after
+  # this many seconds (or when a visit refers to an unknown id).
+  reference_data_ttl_seconds: float = Field(default=300.0, ge=0)
+
+  def db_pool(self) -> PoolProfile:
+    """The selected pool profile with any DB_POOL_* / DB_MAX_OVERFLOW overrides applied."""
+    profile = POOL_PROFILES[self.db_pool_profile]
+    overrides = {
+      "pool_size": self.db_pool_size,
+      "max_overflow": self.db_max_overflow,
+      "pool_timeout": self.db_pool_timeout_seconds,
+      "pool_recycle": self.db_pool_recycle_seconds,
+      "pool_pre_ping": self.db_pool_pre_ping,
+    }
+    return replace(profile, **{k: v for k, v in overrides.items() if v is not None})
+
   @model_validator(mode="after")
   def build_database_url(self) -> "Settings":
     """Build DATABASE_URL from components if not provided."""
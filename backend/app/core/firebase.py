@@ -1,16 +1,26 @@
 """Firebase Admin SDK initialization and utilities."""
 
+import asyncio
 import base64
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
 import firebase_admin
 from firebase_admin import auth, credentials
 
+from app.core.cache import CacheStats, TTLCache
 from app.core.config import get_settings
+from app.core.token_verifier import (
+    GOOGLE_SECURETOKEN_CERTS_URL,
+    FirebaseTokenVerifier,
+    SigningKeyStore,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -133,3 +143,113 @@ def verify_firebase_token(id_token: str) -> dict:
         logger.error(f"Token verification failed: {type(e).__name__}: {e}")
         raise
 
+
+@lru_cache()
+def _verify_executor() -> ThreadPoolExecutor:
+    """Bounded worker pool for token verification (RSA checks + cert fetches)."""
+    settings = get_settings()
+    return ThreadPoolExecutor(
+        max_workers=settings.firebase_verify_max_workers,
+        thread_name_prefix="firebase-verify",
+    )
+
+
+@lru_cache()
+def _token_cache() -> TTLCache[str, dict]:
+    """Verified token claims keyed by SHA-256 of the raw token (wall-clock expiry)."""
+    settings = get_settings()
+    return TTLCache(settings.firebase_token_cache_max_entries, clock=time.time)
+
+
+def _token_digest(id_token: str) -> str:
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+def _cache_decoded_token(digest: str, decoded_token: dict) -> None:
+    """Cache claims until the token's ``exp`` or the configured TTL, whichever is sooner."""
+    exp = decoded_token.get("exp")
+    if not isinstance(exp, (int, float)):
+        return
+    settings = get_settings()
+    expires_at = min(float(exp), time.time() + settings.firebase_token_cache_ttl_seconds)
+    _token_cache().set(digest, decoded_token, expires_at)
+
+
+@lru_cache()
+def get_token_verifier() -> FirebaseTokenVerifier:
+    """In-process ID token verifier backed by cached Google signing keys."""
+    settings = get_settings()
+    key_store = SigningKeyStore(
+        settings.firebase_certs_url or GOOGLE_SECURETOKEN_CERTS_URL,
+        refresh_margin=settings.firebase_keys_refresh_margin_seconds,
+        stale_grace=settings.firebase_keys_stale_grace_seconds,
+    )
+    return FirebaseTokenVerifier(
+        settings.firebase_project_id,
+        key_store,
+        clock_skew_seconds=settings.firebase_token_clock_skew_seconds,
+    )
+
+
+def _uses_local_verifier() -> bool:
+    return get_settings().firebase_token_verifier == "local"
+
+
+async def start_token_verifier() -> None:
+    """Begin background signing-key refresh when the local verifier is enabled."""
+    if _uses_local_verifier():
+        get_token_verifier().key_store.start_background_refresh()
+
+
+async def stop_token_verifier() -> None:
+    """Stop background signing-key refresh (called on application shutdown)."""
+    if get_token_verifier.cache_info().currsize:
+        await get_token_verifier().key_store.stop_background_refresh()
+
+
+async def verify_firebase_token_async(id_token: str) -> dict:
+    """
+    Verify a Firebase ID token without blocking the event loop.
+
+    By default tokens are checked in-process against Google signing keys that are
+    cached and refreshed in the background (see ``app.core.token_verifier``). With
+    ``FIREBASE_TOKEN_VERIFIER=admin`` the synchronous ``firebase_admin`` check runs on
+    a small dedicated thread pool instead; the pool size caps concurrent checks.
+
+    Clients reuse one ID token until it expires, so decoded claims are cached by
+    token digest and repeat calls skip verification entirely.
+
+    Raises:
+        TokenVerificationError: If the token is invalid (local verifier).
+        Same exceptions as :func:`verify_firebase_token` (admin verifier).
+    """
+    digest = _token_digest(id_token)
+    cached = _token_cache().get(digest)
+    if cached is not None:
+        return cached
+
+    if _uses_local_verifier():
+        try:
+            decoded_token = await get_token_verifier().verify(id_token)
+        except Exception as e:
+            logger.warning(f"Invalid ID token: {e}")
+            raise
+    else:
+        loop = asyncio.get_running_loop()
+        decoded_token = await loop.run_in_executor(
+            _verify_executor(), verify_firebase_token, id_token
+        )
+    _cache_decoded_token(digest, decoded_token)
+    return decoded_token
+
+
+def token_cache_stats() -> CacheStats:
+    """Hit/miss counters and size of the verified-token cache."""
+    return _token_cache().stats()
+
+
+def shutdown_verify_executor() -> None:
+    """Stop the verification thread pool (called on application shutdown)."""
+    if _verify_executor.cache_info().currsize:
+        _verify_executor().shutdown(wait=False, cancel_futures=True)
+        _verify_executor.cache_clear()
@@ -0,0 +1,75 @@
+"""Shared outbound HTTP client for Google/Firebase REST calls.
+
+One pooled ``httpx.AsyncClient`` is created in the app lifespan and reused, so
+Identity Toolkit and signing-key requests keep their TLS connections alive instead
+of paying a handshake per call.
+"""
+
+import logging
+
+import httpx
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Create a pooled client from the ``HTTP_CLIENT_*`` settings."""
+    http2 = settings.http_client_http2
+    if http2 and not _http2_available():
+        logger.warning(
+            "HTTP_CLIENT_HTTP2 is set but 'h2' is not installed "
+            "(pip install 'httpx[http2]'); using HTTP/1.1"
+        )
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_client_max_connections,
+            max_keepalive_connections=settings.http_client_max_keepalive_connections,
+            keepalive_expiry=settings.http_client_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.http_client_timeout_seconds,
+            connect=settings.http_client_connect_timeout_seconds,
+        ),
+    )
+
+
+async def start_http_client() -> None:
+    """Create the shared client (called on application startup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_http_client(get_settings())
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections (called on shutdown)."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client.
+
+    Created lazily when used outside the app lifespan (scripts, tests).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_http_client(get_settings())
+    return _client
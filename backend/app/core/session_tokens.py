@@ -0,0 +1,123 @@
+"""Backend-issued session tokens: a cheap alternative to per-request Firebase checks.
+
+When ``SESSION_TOKENS_ENABLED`` is set, a Firebase ID token is verified once (at
+login, Google sign-in or ``POST /auth/session``) and exchanged for a short-lived
+HS256 token that carries the internal user id. Requests presenting it are
+authenticated with an HMAC check and need no user lookup.
+
+Keys come from ``SESSION_TOKEN_KEYS`` as ``kid:secret`` pairs; the first pair signs
+and every listed pair verifies, so keys can be rotated by prepending a new one.
+Bumping ``SESSION_TOKEN_VERSION`` revokes every token minted under older versions.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+import jwt
+
+from app.core.config import Settings, get_settings
+
+SESSION_TOKEN_ISSUER = "nhl-arenas-api"
+SESSION_TOKEN_AUDIENCE = "nhl-arenas-session"
+_ALGORITHM = "HS256"
+
+
+class SessionTokenError(ValueError):
+    """Raised when a session token is malformed, expired, revoked or badly signed."""
+
+
+def session_signing_keys(settings: Settings) -> list[tuple[str, str]]:
+    """Parse ``SESSION_TOKEN_KEYS`` into ordered ``(kid, secret)`` pairs."""
+    keys: list[tuple[str, str]] = []
+    for entry in settings.session_token_keys.split(","):
+        kid, sep, secret = entry.strip().partition(":")
+        if sep and kid and secret:
+            keys.append((kid, secret))
+    return keys
+
+
+def is_session_token(token: str) -> bool:
+    """True if the token is HMAC-signed (Firebase ID tokens are always RS256)."""
+    try:
+        return jwt.get_unverified_header(token).get("alg") == _ALGORITHM
+    except jwt.PyJWTError:
+        return False
+
+
+def mint_session_token(
+    *,
+    user_id: uuid.UUID,
+    created_at: datetime,
+    firebase_claims: dict,
+) -> tuple[str, int]:
+    """
+    Sign a session token for an already-verified Firebase user.
+
+    Returns the token and its lifetime in seconds.
+    """
+    settings = get_settings()
+    keys = session_signing_keys(settings)
+    if not keys:
+        raise SessionTokenError("SESSION_TOKEN_KEYS must be set to issue session tokens")
+    kid, secret = keys[0]
+
+    now = int(time.time())
+    ttl = settings.session_token_ttl_seconds
+    payload = {
+        "iss": SESSION_TOKEN_ISSUER,
+        "aud": SESSION_TOKEN_AUDIENCE,
+        "sub": firebase_claims["uid"],
+        "iat": now,
+        "exp": now + ttl,
+        "ver": settings.session_token_version,
+        "app_user_id": str(user_id),
+        "app_user_created_at": int(created_at.timestamp()),
+        "email": firebase_claims.get("email"),
+        "email_verified": firebase_claims.get("email_verified", False),
+        "name": firebase_claims.get("name"),
+        "picture": firebase_claims.get("picture"),
+    }
+    token = jwt.encode(payload, secret, algorithm=_ALGORITHM, headers={"kid": kid})
+    return token, ttl
+
+
+def verify_session_token(token: str) -> dict:
+    """
+    Verify a session token and return claims in the shape ``FirebaseUser`` expects
+    (``uid`` plus profile fields), with ``app_user_id`` and ``app_user_created_at``.
+    """
+    settings = get_settings()
+    if not settings.session_tokens_enabled:
+        raise SessionTokenError("Session tokens are not enabled")
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except jwt.PyJWTError as e:
+        raise SessionTokenError(f"Malformed session token: {e}") from e
+    secret = dict(session_signing_keys(settings)).get(kid)
+    if secret is None:
+        raise SessionTokenError("Session token signed with an unknown key")
+
+    try:
+        claims = jwt.decode(
+            token,
+            secret,
+            algorithms=[_ALGORITHM],
+            audience=SESSION_TOKEN_AUDIENCE,
+            issuer=SESSION_TOKEN_ISSUER,
+            options={"require": ["exp", "iat", "sub", "ver", "app_user_id"]},
+        )
+    except jwt.ExpiredSignatureError as e:
+        raise SessionTokenError("Session token has expired") from e
+    except jwt.PyJWTError as e:
+        raise SessionTokenError(f"Invalid session token: {e}") from e
+
+    if claims["ver"] < settings.session_token_version:
+        raise SessionTokenError("Session token has been revoked")
+
+    claims["uid"] = claims["sub"]
+    claims["app_user_created_at"] = datetime.fromtimestamp(
+        claims.get("app_user_created_at", 0), tz=timezone.utc
+    )
+    return claims
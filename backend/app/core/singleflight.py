@@ -0,0 +1,51 @@
+"""Request coalescing: concurrent callers with the same key share one execution."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Run at most one ``fn`` per key at a time; callers arriving while it is in
+    flight await the same result (or exception) instead of running their own.
+
+    The first caller (the leader) runs ``fn`` in its own task context, so ``fn`` may
+    use resources owned by that caller such as its DB session. If the leader is
+    cancelled, waiting callers retry and one of them becomes the new leader.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Future[T]] = {}
+
+    def in_flight(self, key: K) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this caller was cancelled, not the leader
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader-only failure does not log "never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
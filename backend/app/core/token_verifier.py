@@ -0,0 +1,237 @@
+"""In-process verification of Firebase ID tokens against cached Google signing keys.
+
+Firebase ID tokens are RS256 JWTs signed by keys published at Google's securetoken
+x509 endpoint. The keys are kept in memory for the lifetime given by the endpoint's
+``Cache-Control: max-age`` and refreshed by a background task shortly before they
+expire, so request handlers never wait on a cert download once the app is warm.
+If the endpoint is unavailable, the last keys keep being served for a bounded grace
+period while the background task retries.
+"""
+
+import asyncio
+import logging
+import re
+import time
+
+import httpx
+import jwt
+from cryptography import x509
+
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SECURETOKEN_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+# Used when the key endpoint omits Cache-Control (Google normally sends several hours).
+_DEFAULT_MAX_AGE_SECONDS = 3600
+_RETRY_DELAY_SECONDS = 30.0
+
+
+class TokenVerificationError(ValueError):
+    """Raised when an ID token is malformed, expired, or fails signature/claim checks."""
+
+
+def _max_age_seconds(response: httpx.Response) -> int:
+    """Remaining freshness of a key response (``max-age`` minus any ``Age``)."""
+    match = _MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+    if match is None:
+        return _DEFAULT_MAX_AGE_SECONDS
+    age = response.headers.get("age", "0")
+    return max(int(match.group(1)) - (int(age) if age.isdigit() else 0), 0)
+
+
+def _parse_signing_keys(payload: dict) -> dict[str, object]:
+    """Map key id to public key from either x509 (``{kid: pem}``) or JWKS payloads."""
+    if isinstance(payload.get("keys"), list):
+        return {
+            jwk["kid"]: jwt.PyJWK(jwk).key
+            for jwk in payload["keys"]
+            if isinstance(jwk, dict) and jwk.get("kid")
+        }
+    return {
+        kid: x509.load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+        for kid, pem in payload.items()
+        if isinstance(pem, str)
+    }
+
+
+class SigningKeyStore:
+    """
+    In-memory copy of the securetoken public keys.
+
+    ``refresh_margin`` is how long before expiry the background task re-fetches.
+    ``min_refresh_interval`` rate-limits on-demand refreshes (failed ones included).
+    ``stale_grace`` is how long past expiry the last keys are still served when
+    refreshing fails.
+    Downloads go through the shared HTTP client unless ``client`` is given.
+    """
+
+    def __init__(
+        self,
+        certs_url: str = GOOGLE_SECURETOKEN_CERTS_URL,
+        *,
+        refresh_margin: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        stale_grace: float = 3600.0,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.certs_url = certs_url
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self.stale_grace = stale_grace
+        self._client = client
+        self._keys: dict[str, object] = {}
+        self._expires_at = 0.0
+        self._last_attempt = float("-inf")
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return bool(self._keys) and time.monotonic() < self._expires_at
+
+    @property
+    def is_usable(self) -> bool:
+        """Keys are fresh, or expired less than ``stale_grace`` seconds ago."""
+        return bool(self._keys) and time.monotonic() < self._expires_at + self.stale_grace
+
+    async def refresh(self) -> None:
+        """Download the current key set and reset its expiry from Cache-Control."""
+        self._last_attempt = time.monotonic()
+        client = self._client or get_http_client()
+        response = await client.get(self.certs_url)
+        response.raise_for_status()
+
+        keys = _parse_signing_keys(response.json())
+        if not keys:
+            raise TokenVerificationError("Signing key endpoint returned no keys")
+
+        self._keys = keys
+        self._expires_at = time.monotonic() + _max_age_seconds(response)
+        logger.debug("Loaded %d Firebase signing keys from %s", len(keys), self.certs_url)
+
+    async def get_key(self, kid: str) -> object:
+        """
+        Return the public key for ``kid``, fetching keys only when stale or rotated.
+
+        At most one on-demand fetch runs per ``min_refresh_interval``, whether or not
+        it succeeds, so an endpoint outage costs one upstream call rather than one per
+        request; until keys are reloaded, the last ones are served within the grace.
+        """
+        key = self._keys.get(kid) if self.is_fresh else None
+        if key is not None:
+            return key
+
+        async with self._lock:
+            # Another request may have refreshed (or tried to) while we waited for the lock.
+            fresh_hit = self.is_fresh and kid in self._keys
+            recently_tried = time.monotonic() - self._last_attempt < self.min_refresh_interval
+            if not fresh_hit and not recently_tried:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning("Firebase signing key refresh failed: %s", e)
+
+        key = self._keys.get(kid) if self.is_usable else None
+        if key is None:
+            raise TokenVerificationError(f"No signing key found for kid {kid!r}")
+        return key
+
+    def _next_refresh_delay(self) -> float:
+        remaining = self._expires_at - time.monotonic() - self.refresh_margin
+        return max(remaining, self.min_refresh_interval)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh()
+                delay = self._next_refresh_delay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Firebase signing key refresh failed: %s", e)
+                delay = min(_RETRY_DELAY_SECONDS, self._next_refresh_delay())
+            await asyncio.sleep(delay)
+
+    def start_background_refresh(self) -> None:
+        """Fetch keys now and keep them fresh until :meth:`stop_background_refresh`."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(
+                self._refresh_loop(), name="firebase-signing-keys"
+            )
+
+    async def stop_background_refresh(self) -> None:
+        task, self._refresh_task = self._refresh_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+class FirebaseTokenVerifier:
+    """Checks signature, issuer, audience and time claims of Firebase ID tokens."""
+
+    def __init__(
+        self,
+        project_id: str,
+        key_store: SigningKeyStore,
+        *,
+        clock_skew_seconds: int = 0,
+    ) -> None:
+        if not project_id:
+            raise ValueError("FIREBASE_PROJECT_ID must be set in environment variables")
+        self.project_id = project_id
+        self.issuer = f"{FIREBASE_ISSUER_PREFIX}{project_id}"
+        self.key_store = key_store
+        self.clock_skew_seconds = clock_skew_seconds
+
+    async def verify(self, id_token: str) -> dict:
+        """
+        Verify an ID token and return its claims with ``uid`` set from ``sub``
+        (the same shape ``firebase_admin.auth.verify_id_token`` returns).
+        """
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed ID token: {e}") from e
+
+        if header.get("alg") != "RS256":
+            raise TokenVerificationError("ID token has incorrect algorithm")
+        kid = header.get("kid")
+        if not kid:
+            raise TokenVerificationError("ID token has no 'kid' header")
+
+        key = await self.key_store.get_key(kid)
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=self.issuer,
+                leeway=self.clock_skew_seconds,
+                options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise TokenVerificationError("ID token has expired") from e
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid ID token: {e}") from e
+
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("ID token has an invalid 'sub' claim")
+        auth_time = claims.get("auth_time")
+        if isinstance(auth_time, (int, float)) and auth_time > time.time() + self.clock_skew_seconds:
+            raise TokenVerificationError("ID token has a future 'auth_time' claim")
+
+        claims["uid"] = subject
+        return claims
@@ -4,4 +4,6 @@ from sqlalchemy.orm import DeclarativeBase
 class Base(DeclarativeBase):
   """Base class for SQLAlchemy models."""
 
-  pass
+  # Server-generated columns (UUID ids, created_at/updated_at) come back through
+  # RETURNING on the INSERT/UPDATE itself, so nothing needs a refresh afterwards.
+  __mapper_args__ = {"eager_defaults": True}
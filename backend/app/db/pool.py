@@ -0,0 +1,129 @@
+"""Connection pool configuration and checkout metrics.
+
+The engine's pool is built from the selected ``DB_POOL_PROFILE`` and wrapped so each
+checkout is timed. :func:`pool_stats` reports checkout latency, connections in use,
+overflow and acquisition timeouts, which is where pool exhaustion shows up first
+when uvicorn workers are scaled out.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.config import PoolProfile
+
+logger = logging.getLogger(__name__)
+
+# Recent checkout waits kept for percentile estimates.
+_WAIT_SAMPLES = 1024
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time view of the pool plus cumulative checkout counters."""
+
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_ms_avg: float
+    wait_ms_p95: float
+    wait_ms_max: float
+
+
+class PoolMetrics:
+    """Checkout counters and wait-time samples, shared by a pool and its recreations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._waits.append(wait)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waits.clear()
+            self.checkouts = self.timeouts = 0
+            self.wait_total = self.wait_max = 0.0
+
+    def snapshot(self, pool: Pool) -> PoolStats:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            wait_total, wait_max = self.wait_total, self.wait_max
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        size = pool.size() if hasattr(pool, "size") else 0
+        return PoolStats(
+            pool_size=size,
+            max_overflow=getattr(pool, "_max_overflow", 0),
+            checked_out=pool.checkedout() if hasattr(pool, "checkedout") else 0,
+            checked_in=pool.checkedin() if hasattr(pool, "checkedin") else 0,
+            overflow=max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+            checkouts=checkouts,
+            timeouts=timeouts,
+            wait_ms_avg=(wait_total / checkouts * 1000) if checkouts else 0.0,
+            wait_ms_p95=p95 * 1000,
+            wait_ms_max=wait_max * 1000,
+        )
+
+
+def metered_pool_class(metrics: PoolMetrics) -> type[AsyncAdaptedQueuePool]:
+    """
+    ``AsyncAdaptedQueuePool`` subclass that times every checkout into ``metrics``.
+
+    The metrics live on the class so they survive ``Pool.recreate()`` (engine
+    dispose / invalidation), which builds a new instance of the same class.
+    """
+
+    class MeteredAsyncPool(AsyncAdaptedQueuePool):
+        def connect(self) -> Any:
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                logger.warning(
+                    "DB pool exhausted: %d in use, %d overflow, timeout %.1fs",
+                    self.checkedout(),
+                    max(self.overflow(), 0),
+                    self.timeout(),
+                )
+                raise
+            metrics.record_checkout(time.perf_counter() - start)
+            return connection
+
+    return MeteredAsyncPool
+
+
+def engine_pool_options(profile: PoolProfile, metrics: PoolMetrics) -> dict[str, Any]:
+    """Keyword arguments for ``create_async_engine`` that apply a pool profile."""
+    return {
+        "poolclass": metered_pool_class(metrics),
+        "pool_size": profile.pool_size,
+        "max_overflow": profile.max_overflow,
+        "pool_timeout": profile.pool_timeout,
+        "pool_recycle": profile.pool_recycle,
+        "pool_pre_ping": profile.pool_pre_ping,
+    }
@@ -1,12 +1,54 @@
 from collections.abc import AsyncGenerator
 
-from app.core.config import get_settings
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.config import Settings, get_settings
+from app.db.pool import PoolMetrics, PoolStats, engine_pool_options
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 settings = get_settings()
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+
+def driver_connect_args(settings: Settings) -> dict:
+  """
+  psycopg connection options: when (and whether) repeated queries get prepared.
+
+  Transaction-mode poolers hand each transaction a different server connection, so
+  named prepared statements are disabled in DB_PGBOUNCER_MODE.
+  """
+  prepare = settings.db_prepared_statements and not settings.db_pgbouncer_mode
+  return {"prepare_threshold": settings.db_prepare_threshold if prepare else None}
+
+
+def create_engine_from_settings(settings: Settings, metrics: PoolMetrics) -> AsyncEngine:
+  """Async engine with the configured pool profile and driver options."""
+  if settings.db_null_pool:
+    # Let the external pooler own connection reuse; nothing is held between requests.
+    pool_options = {"poolclass": NullPool}
+  else:
+    pool_options = engine_pool_options(settings.db_pool(), metrics)
+  engine = create_async_engine(
+      settings.database_url,
+      echo=False,
+      future=True,
+      connect_args=driver_connect_args(settings),
+      **pool_options,
+  )
+
+  @event.listens_for(engine.sync_engine, "connect")
+  def _configure_prepared_statement_cache(dbapi_connection, connection_record) -> None:
+    # SQLAlchemy emits identical SQL text for each cached statement, so the hot visit
+    # queries map onto a handful of prepared statements per connection. Client-side
+    # only: nothing is SET on the server session, which a pooler would not preserve.
+    dbapi_connection.driver_connection.prepared_max = settings.db_prepared_max
+
+  return engine
+
+
+pool_metrics = PoolMetrics()
+engine = create_engine_from_settings(settings, pool_metrics)
+
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -16,6 +58,11 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+def pool_stats() -> PoolStats:
+  """Current pool usage and checkout metrics for this worker's engine."""
+  return pool_metrics.snapshot(engine.pool)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
   """Yield an async database session."""
   async with AsyncSessionLocal() as session:
@@ -26,12 +73,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 async def save(entity, db: AsyncSession):
   """Helper function to resemble a Spring Boot save. 
-    Adds an entity. Then commits and obtains latest entity values from the DB 
-    (like a udpated timestamp), and returns the updated entity to be used in a service.
+    Adds an entity and commits it. Server-generated values (id, timestamps) are
+    read back by the INSERT/UPDATE itself through RETURNING (models use eager
+    defaults), so no refresh SELECT follows the commit. Returns the saved entity.
     """
   db.add(entity)
   await db.commit()
-  await db.refresh(entity)
+  if db.sync_session.expire_on_commit:
+    # Attributes were expired by the commit; reload them while we still can.
+    await db.refresh(entity)
   return entity
 
 
@@ -8,8 +8,15 @@ from app.core.error_handlers import (
     request_validation_handler,
 )
 from app.core.exceptions import APIException
-from app.core.firebase import initialize_firebase
+from app.core.firebase import (
+    initialize_firebase,
+    shutdown_verify_executor,
+    start_token_verifier,
+    stop_token_verifier,
+)
+from app.core.http_client import close_http_client, start_http_client
 from app.routers import auth, health, reference, visits
+from app.services.profile_sync import start_profile_sync, stop_profile_sync
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -31,8 +38,17 @@ async def lifespan(app: FastAPI):
   logger.info(f"Starting {settings.app_name} in {settings.environment} mode")
   # Initialize Firebase Admin SDK
   initialize_firebase()
+  # Pooled client for Firebase REST calls and signing-key downloads
+  await start_http_client()
+  await start_token_verifier()
+  # Batched background writes of Firebase profile-claim changes
+  start_profile_sync()
   yield
   logger.info("Shutting down...")
+  await stop_profile_sync()
+  await stop_token_verifier()
+  await close_http_client()
+  shutdown_verify_executor()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
@@ -63,7 +79,7 @@ app.add_middleware(
   allow_credentials=False,
   allow_methods=["*"],
   allow_headers=["*"],
-  expose_headers=["x-total-count", "X-Total-Count"],
+  expose_headers=["x-total-count", "X-Total-Count", "x-next-cursor", "X-Next-Cursor"],
 )
 
 # Include routers
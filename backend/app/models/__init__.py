@@ -5,6 +5,17 @@ from app.models.image import Image
 from app.models.team import Team
 from app.models.user import User
 from app.models.visit import Visit
+from app.models.visit_stats import (UserArenaVisitCount, UserTeamVisitCount,
+                                    UserVisitStats)
 
-__all__ = ["Arena", "Image", "Team", "User", "Visit"]
+__all__ = [
+    "Arena",
+    "Image",
+    "Team",
+    "User",
+    "UserArenaVisitCount",
+    "UserTeamVisitCount",
+    "UserVisitStats",
+    "Visit",
+]
 
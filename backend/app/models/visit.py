@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, String, text
+from sqlalchemy import Date, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,10 @@ class Visit(Base):
     """
 
     __tablename__ = "visits"
+    __table_args__ = (
+        # List/latest: one user's visits in visit_date DESC order, id as tiebreak
+        Index("ix_visits_user_id_visit_date_id", "user_id", text("visit_date DESC"), "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -27,7 +31,6 @@ class Visit(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id"),
         nullable=False,
-        index=True,
     )
     arena_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -0,0 +1,78 @@
+"""Per-user visit counters maintained alongside visits (see app.services.visit_stats)."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class UserVisitStats(Base):
+    """
+    Home-screen counters for one user, updated in the same transaction as the visit.
+    """
+
+    __tablename__ = "user_visit_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    total_visits: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    teams_seen: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    arenas_visited: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class UserTeamVisitCount(Base):
+    """
+    How many of a user's visits involved a team (home and away each count once).
+
+    Rows exist only while the count is positive, so the row count is teams_seen.
+    """
+
+    __tablename__ = "user_team_visit_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    team_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("teams.id"),
+        primary_key=True,
+    )
+    visits: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class UserArenaVisitCount(Base):
+    """
+    How many of a user's visits were at an arena.
+
+    Rows exist only while the count is positive, so the row count is arenas_visited.
+    """
+
+    __tablename__ = "user_arena_visit_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    arena_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("arenas.id"),
+        primary_key=True,
+    )
+    visits: Mapped[int] = mapped_column(Integer, nullable=False)
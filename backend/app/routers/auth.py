@@ -2,22 +2,28 @@
 
 from app.core.auth import FirebaseUser, get_current_user
 from app.core.config import get_settings
-from app.core.firebase import verify_firebase_token
+from app.core.exceptions import ResourceNotFoundError, UnauthorizedError
+from app.core.firebase import verify_firebase_token_async
+from app.core.session_tokens import mint_session_token
 from app.db.session import get_db
+from app.models.user import User
 from app.schemas.auth import (
     GoogleSignInRequest,
     LoginRequest,
     LoginResponse,
+    RefreshRequest,
     RegisterRequest,
+    SessionTokenResponse,
 )
 from app.services.auth_errors import raise_auth_http_error
 from app.services.firebase_login import (
     FirebaseLoginError,
+    refresh_id_token,
     sign_in_with_google_id_token,
     sign_in_with_password,
     sign_up_with_password,
 )
-from app.services.user_service import get_or_create_user
+from app.services.user_service import get_or_create_user, resolve_user
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -32,14 +38,43 @@ def _login_response_from_firebase(data: dict) -> LoginResponse:
     )
 
 
-@router.post("/login", response_model=LoginResponse, summary="Login with email and password")
-async def login(body: LoginRequest) -> LoginResponse:
+async def _sync_user(db: AsyncSession, id_token: str) -> tuple[User, dict]:
+    """Verify a fresh ID token once and make sure the user row exists."""
+    decoded = await verify_firebase_token_async(id_token)
+    user = await get_or_create_user(db, FirebaseUser(decoded))
+    return user, decoded
+
+
+def _with_session_token(response: LoginResponse, user: User, claims: dict) -> LoginResponse:
+    """Attach a backend session token when session tokens are enabled."""
+    if get_settings().session_tokens_enabled:
+        response.session_token, response.session_expires_in = mint_session_token(
+            user_id=user.id,
+            created_at=user.created_at,
+            firebase_claims=claims,
+        )
+    return response
+
+
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    response_model_exclude_none=True,
+    summary="Login with email and password",
+)
+async def login(
+    body: LoginRequest,
+    db: AsyncSession = Depends(get_db),
+) -> LoginResponse:
     """
     Exchange email/password for a Firebase ID token (JWT) and refresh token.
 
     The frontend should store the id_token and send it in the Authorization header
     as "Bearer <id_token>" for protected endpoints. Use refresh_token to obtain
-    a new id_token when it expires (e.g. via Firebase REST refresh endpoint).
+    a new id_token when it expires (POST /api/v1/auth/refresh).
+
+    With session tokens enabled, the response also carries a backend session_token
+    that can be sent as the Bearer token instead of the id_token.
     """
     settings = get_settings()
     try:
@@ -51,12 +86,17 @@ async def login(body: LoginRequest) -> LoginResponse:
     except FirebaseLoginError as e:
         raise_auth_http_error(e, register=False)
 
-    return _login_response_from_firebase(data)
+    response = _login_response_from_firebase(data)
+    if settings.session_tokens_enabled:
+        user, claims = await _sync_user(db, data["idToken"])
+        _with_session_token(response, user, claims)
+    return response
 
 
 @router.post(
     "/register",
     response_model=LoginResponse,
+    response_model_exclude_none=True,
     summary="Register with email and password",
 )
 async def register(
@@ -79,15 +119,15 @@ async def register(
     except FirebaseLoginError as e:
         raise_auth_http_error(e, register=True)
 
-    decoded = verify_firebase_token(data["idToken"])
-    await get_or_create_user(db, FirebaseUser(decoded))
+    user, claims = await _sync_user(db, data["idToken"])
 
-    return _login_response_from_firebase(data)
+    return _with_session_token(_login_response_from_firebase(data), user, claims)
 
 
 @router.post(
     "/google",
     response_model=LoginResponse,
+    response_model_exclude_none=True,
     summary="Sign in with Google",
 )
 async def google_sign_in(
@@ -109,10 +149,72 @@ async def google_sign_in(
     except FirebaseLoginError as e:
         raise_auth_http_error(e, register=False)
 
-    decoded = verify_firebase_token(data["idToken"])
-    await get_or_create_user(db, FirebaseUser(decoded))
+    user, claims = await _sync_user(db, data["idToken"])
 
-    return _login_response_from_firebase(data)
+    return _with_session_token(_login_response_from_firebase(data), user, claims)
+
+
+@router.post(
+    "/refresh",
+    response_model=LoginResponse,
+    response_model_exclude_none=True,
+    summary="Refresh an expired ID token",
+)
+async def refresh(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_db),
+) -> LoginResponse:
+    """
+    Exchange a refresh token for a new Firebase ID token (and rotated refresh token).
+
+    Returns the same token payload as login. Concurrent refreshes of the same token
+    are coalesced into a single upstream call.
+    """
+    settings = get_settings()
+    try:
+        data = await refresh_id_token(
+            api_key=settings.firebase_api_key,
+            refresh_token=body.refresh_token,
+        )
+    except FirebaseLoginError as e:
+        raise_auth_http_error(e, register=False)
+
+    response = _login_response_from_firebase(data)
+    if settings.session_tokens_enabled:
+        user, claims = await _sync_user(db, data["idToken"])
+        _with_session_token(response, user, claims)
+    return response
+
+
+@router.post(
+    "/session",
+    response_model=SessionTokenResponse,
+    summary="Exchange a Firebase ID token for a backend session token",
+)
+async def create_session(
+    firebase_user: FirebaseUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> SessionTokenResponse:
+    """
+    Verify the Firebase ID token in the Authorization header once and return a
+    short-lived session token carrying the internal user id.
+
+    Protected endpoints accept the session token as "Bearer <session_token>" and
+    authenticate it with a symmetric check and no user lookup. Only available when
+    SESSION_TOKENS_ENABLED is set.
+    """
+    if not get_settings().session_tokens_enabled:
+        raise ResourceNotFoundError("Session tokens are not enabled")
+    if firebase_user.app_user_id is not None:
+        raise UnauthorizedError(detail="A Firebase ID token is required")
+
+    user = await get_or_create_user(db, firebase_user)
+    token, expires_in = mint_session_token(
+        user_id=user.id,
+        created_at=user.created_at,
+        firebase_claims=firebase_user.firebase_claims,
+    )
+    return SessionTokenResponse(session_token=token, expires_in=expires_in)
 
 
 @router.get("/me", summary="Get current user information")
@@ -126,11 +228,13 @@ async def get_me(
     This endpoint requires authentication - the client must send a Firebase ID token
     in the Authorization header: "Bearer <firebase-id-token>"
     
-    On first call, creates the user in the database. On subsequent calls, updates
-    the user's info if it changed in Firebase.
+    On first call, creates the user in the database. On subsequent calls, profile
+    changes from Firebase (email, display name, photo) are queued and written to
+    the database by the next profile-sync flush (immediately when
+    PROFILE_SYNC_DEFERRED=false).
     """
-    # Get or create user in database
-    user = await get_or_create_user(db, firebase_user)
+    # Get or create user in database (cached per uid while the profile is unchanged)
+    user = await resolve_user(db, firebase_user)
     
     return {
         "uid": user.firebase_uid,
@@ -1,3 +1,8 @@
+from dataclasses import asdict
+
+from app.core.config import get_settings
+from app.db.session import pool_stats
+from app.schemas.health import PoolStatsResponse
 from fastapi import APIRouter
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -7,3 +12,14 @@ router = APIRouter(prefix="/health", tags=["health"])
 async def health_check() -> dict[str, str]:
   """Returns the health status of the API."""
   return {"status": "ok"}
+
+
+@router.get("/pool", response_model=PoolStatsResponse, summary="Database pool metrics")
+async def pool_health() -> PoolStatsResponse:
+  """
+  Connection pool usage for this worker: connections in use and idle, overflow,
+  cumulative checkouts and acquisition timeouts, and recent checkout wait times.
+  Sustained non-zero timeouts or waits near DB_POOL_TIMEOUT_SECONDS mean the pool
+  (or Postgres max_connections across workers) is too small.
+  """
+  return PoolStatsResponse(profile=get_settings().db_pool_profile, **asdict(pool_stats()))
@@ -4,12 +4,13 @@ import logging
 import uuid
 
 from app.core.auth import FirebaseUser, get_current_user
+from app.core.exceptions import ValidationError
 from app.db.session import get_db
 from app.schemas.stats import VisitStatsResponse
 from app.schemas.visit import VisitCreate, VisitResponse, VisitUpdate
 from app.services.nhl_game_lookup import (enrich_visits_with_game_scores,
                                           lookup_game_for_visit)
-from app.services.user_service import get_or_create_user
+from app.services.user_service import resolve_user
 from app.services.visits import (create_new_visit, delete_visit_by_id,
                                  get_latest_visit_for_user,
                                  get_user_visit_stats, get_users_visits,
@@ -24,6 +25,7 @@ router = APIRouter(prefix="/api/v1/visits", tags=["visits"])
 
 # Header Constants
 X_TOTAL_COUNT = "X-Total-Count"
+X_NEXT_CURSOR = "X-Next-Cursor"
 
 
 @router.get(
@@ -36,7 +38,7 @@ async def get_visit_stats(
     db: AsyncSession = Depends(get_db),
 ) -> VisitStatsResponse:
     """SQL-only counters for home profile (no visit rows, no NHL calls)."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
     logger.info("Request received to get visit stats for user: %s", user.id)
     return await get_user_visit_stats(user, db)
 
@@ -51,13 +53,13 @@ async def get_latest_visit(
     db: AsyncSession = Depends(get_db),
 ) -> VisitResponse | None:
     """Get latest visit for the current user."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
     logger.info("Request received to get latest visit for user: %s", user.id)
     visit = await get_latest_visit_for_user(user, db)
     if visit is None:
         return None
-    game = await lookup_game_for_visit(visit)
-    return visit.model_copy(update={"game": game})
+    visit.game = await lookup_game_for_visit(visit)
+    return visit
 
 
 @router.get(
@@ -71,13 +73,32 @@ async def get_visits(
     db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0, description="Number of visits to skip."),
     limit: int = Query(20, ge=1, le=100, description="Maximum visits to return."),
+    cursor: str | None = Query(
+        None,
+        description="Resume after the previous page (its X-Next-Cursor header). "
+        "Use instead of skip.",
+    ),
+    include_total: bool = Query(
+        True, description="Return the X-Total-Count header. Set false to skip counting."
+    ),
 ) -> list[VisitResponse]:
-    """Get paginated visits for the current user, newest first."""
-    user = await get_or_create_user(db, firebase_user)
+    """
+    Get paginated visits for the current user, newest first.
+
+    When more visits exist, the X-Next-Cursor header holds a cursor for the next page.
+    """
+    if cursor and skip:
+        raise ValidationError("Use either cursor or skip, not both")
+    user = await resolve_user(db, firebase_user)
 
     logger.info("Request received to list visits for user: %s", user.id)
-    visits, total = await get_users_visits(user, db, skip, limit)
-    response.headers[X_TOTAL_COUNT] = str(total)
+    visits, total, next_cursor = await get_users_visits(
+        user, db, skip, limit, cursor, include_total=include_total
+    )
+    if total is not None:
+        response.headers[X_TOTAL_COUNT] = str(total)
+    if next_cursor:
+        response.headers[X_NEXT_CURSOR] = next_cursor
     # TODO: Add saving game data to the DB and favor that over re-calling NHLE.
     return await enrich_visits_with_game_scores(visits)
 
@@ -93,14 +114,14 @@ async def get_visit(
     db: AsyncSession = Depends(get_db),
 ) -> VisitResponse:
     """Return one visit if it belongs to the current user."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
 
     logger.info("Request received to get visit %s for user: %s", visit_id, user.id)
     visit = await get_visit_by_id_for_user(visit_id, user, db)
     # TODO: Add saving game data to the DB and favor that over re-calling NHLE. 
     # Refetch from NHLE if game is less than a day old (score changes while live).
-    game = await lookup_game_for_visit(visit)
-    return visit.model_copy(update={"game": game})
+    visit.game = await lookup_game_for_visit(visit)
+    return visit
 
 
 @router.post(
@@ -115,13 +136,13 @@ async def create_visit(
     db: AsyncSession = Depends(get_db)
 ) -> VisitResponse:
     """Create a new visit for the current user."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
 
     logger.info("Request received to create visit for user: %s", user.id)
     created_visit = await create_new_visit(visit, user, db)
     # TODO: Add saving game data to the DB and favor that over re-calling NHLE.
-    game = await lookup_game_for_visit(created_visit)
-    return created_visit.model_copy(update={"game": game})
+    created_visit.game = await lookup_game_for_visit(created_visit)
+    return created_visit
 
 
 @router.patch(
@@ -136,7 +157,7 @@ async def update_visit(
     db: AsyncSession = Depends(get_db),
 ) -> VisitResponse:
     """Update one or more fields on an existing visit (does not create visits)."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
 
     logger.info("Request received to patch visit %s for user: %s", visit_id, user.id)
     return await update_visit_for_user(visit_id, payload, user, db)
@@ -153,7 +174,7 @@ async def delete_visit(
     db: AsyncSession = Depends(get_db)
 ) -> None:
     """Delete a given visit for the current user."""
-    user = await get_or_create_user(db, firebase_user)
+    user = await resolve_user(db, firebase_user)
 
     logger.info("Request received to delete visit for user: %s", user.id)
     await delete_visit_by_id(visit_id, user, db)
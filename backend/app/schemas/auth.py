@@ -23,9 +23,25 @@ class GoogleSignInRequest(BaseModel):
     id_token: str
 
 
+class RefreshRequest(BaseModel):
+    """Refresh token previously returned by login, register or Google sign-in."""
+
+    refresh_token: str
+
+
 class LoginResponse(BaseModel):
     """JWT and refresh token returned after successful login."""
 
     id_token: str
     refresh_token: str
     expires_in: int  # seconds until id_token expires
+    # Only present when backend session tokens are enabled
+    session_token: str | None = None
+    session_expires_in: int | None = None
+
+
+class SessionTokenResponse(BaseModel):
+    """Backend session token exchanged for a verified Firebase ID token."""
+
+    session_token: str
+    expires_in: int  # seconds until session_token expires
@@ -0,0 +1,19 @@
+"""Health and diagnostics responses."""
+
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    """Database connection pool usage for the worker that served the request."""
+
+    profile: str
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_ms_avg: float
+    wait_ms_p95: float
+    wait_ms_max: float
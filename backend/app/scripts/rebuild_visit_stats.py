@@ -0,0 +1,91 @@
+"""Check (and optionally rebuild) the per-user visit stats tables against visits.
+
+Run from the backend directory with the virtual environment activated:
+  cd backend
+  source .venv/bin/activate   # or: .venv\\Scripts\\activate on Windows
+  python -m app.scripts.rebuild_visit_stats           # report drift, exit 1 if any
+  python -m app.scripts.rebuild_visit_stats --apply   # recompute all stats tables
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Ensure app is importable when run as __main__
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+try:
+    import sqlalchemy  # noqa: F401
+except ModuleNotFoundError:
+    print(
+        "Missing dependency. Run from the backend directory with the venv activated:\n"
+        "  cd backend\n"
+        "  source .venv/bin/activate\n"
+        "  pip install -e .\n"
+        "  python -m app.scripts.rebuild_visit_stats",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+from app.db.session import AsyncSessionLocal
+from app.services.visit_stats import find_visit_stats_drift, rebuild_visit_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Drifted users listed individually before the report is summarized.
+_MAX_REPORTED = 20
+
+
+async def check_visit_stats(apply: bool) -> int:
+    """Report drift; with ``apply`` rebuild the tables. Returns the drifted user count."""
+    async with AsyncSessionLocal() as session:
+        try:
+            drift = await find_visit_stats_drift(session)
+            for entry in drift[:_MAX_REPORTED]:
+                logger.warning(
+                    "User %s: stored %s, expected %s, %d team / %d arena counts differ",
+                    entry.user_id,
+                    entry.stored,
+                    entry.expected,
+                    entry.team_count_mismatches,
+                    entry.arena_count_mismatches,
+                )
+            if len(drift) > _MAX_REPORTED:
+                logger.warning("... and %d more users", len(drift) - _MAX_REPORTED)
+            logger.info("Visit stats drift: %d users", len(drift))
+
+            if apply:
+                await rebuild_visit_stats(session)
+                await session.commit()
+                logger.info("Visit stats rebuilt from visits.")
+            return len(drift)
+        except Exception as e:
+            logger.exception("Visit stats check failed: %s", e)
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+def main() -> None:
+    """Entrypoint for python -m app.scripts.rebuild_visit_stats."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="recompute every user's stats from visits (otherwise only report drift)",
+    )
+    args = parser.parse_args()
+    drifted = asyncio.run(check_visit_stats(args.apply))
+    if drifted and not args.apply:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
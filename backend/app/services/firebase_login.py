@@ -1,14 +1,30 @@
 """Firebase Identity Toolkit REST API - email/password sign-in and sign-up."""
 
+import hashlib
 import logging
 
-import httpx
+from app.core.config import get_settings
+from app.core.http_client import get_http_client
+from app.core.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-FIREBASE_SIGN_IN_URL = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword"
-FIREBASE_SIGN_UP_URL = "https://identitytoolkit.googleapis.com/v1/accounts:signUp"
-FIREBASE_SIGN_IN_IDP_URL = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithIdp"
+FIREBASE_AUTH_BASE_URL = "https://identitytoolkit.googleapis.com/v1"
+FIREBASE_SECURETOKEN_BASE_URL = "https://securetoken.googleapis.com/v1"
+
+# One upstream refresh per refresh token at a time (keyed by token digest).
+_refreshes: SingleFlight[str, dict] = SingleFlight()
+
+
+def _identity_toolkit_url(method: str) -> str:
+    """Identity Toolkit endpoint, honoring FIREBASE_AUTH_BASE_URL (e.g. a local stand-in)."""
+    base = get_settings().firebase_auth_base_url or FIREBASE_AUTH_BASE_URL
+    return f"{base.rstrip('/')}/accounts:{method}"
+
+
+def _securetoken_url() -> str:
+    base = get_settings().firebase_securetoken_base_url or FIREBASE_SECURETOKEN_BASE_URL
+    return f"{base.rstrip('/')}/token"
 
 
 class FirebaseLoginError(Exception):
@@ -37,8 +53,7 @@ async def _email_password_request(
         "returnSecureToken": True,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(f"{url}?key={api_key}", json=payload)
+    response = await get_http_client().post(f"{url}?key={api_key}", json=payload)
 
     if response.is_success:
         data = response.json()
@@ -66,7 +81,7 @@ async def sign_in_with_password(api_key: str, email: str, password: str) -> dict
     Raises FirebaseLoginError on invalid credentials or other auth errors.
     """
     return await _email_password_request(
-        url=FIREBASE_SIGN_IN_URL,
+        url=_identity_toolkit_url("signInWithPassword"),
         api_key=api_key,
         email=email,
         password=password,
@@ -91,8 +106,9 @@ async def sign_in_with_google_id_token(api_key: str, google_id_token: str) -> di
         "returnSecureToken": True,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(f"{FIREBASE_SIGN_IN_IDP_URL}?key={api_key}", json=payload)
+    response = await get_http_client().post(
+        f"{_identity_toolkit_url('signInWithIdp')}?key={api_key}", json=payload
+    )
 
     if response.is_success:
         data = response.json()
@@ -120,9 +136,55 @@ async def sign_up_with_password(api_key: str, email: str, password: str) -> dict
     Raises FirebaseLoginError on duplicate email, weak password, or other auth errors.
     """
     return await _email_password_request(
-        url=FIREBASE_SIGN_UP_URL,
+        url=_identity_toolkit_url("signUp"),
         api_key=api_key,
         email=email,
         password=password,
         action="sign-up",
     )
+
+
+async def refresh_id_token(api_key: str, refresh_token: str) -> dict:
+    """
+    Exchange a refresh token for a new ID token via the Secure Token REST API.
+
+    Concurrent calls with the same refresh token (e.g. a device retrying) share a
+    single upstream request. Returns a dict with idToken, refreshToken and expiresIn
+    (the same keys as sign-in responses). Raises FirebaseLoginError on expired or
+    revoked refresh tokens.
+    """
+    if not api_key:
+        raise FirebaseLoginError("Firebase API key is not configured", code="CONFIG_ERROR")
+
+    key = hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+    return await _refreshes.do(key, lambda: _refresh_id_token(api_key, refresh_token))
+
+
+async def _refresh_id_token(api_key: str, refresh_token: str) -> dict:
+    response = await get_http_client().post(
+        f"{_securetoken_url()}?key={api_key}",
+        data={"grant_type": "refresh_token", "refresh_token": refresh_token},
+    )
+
+    if response.is_success:
+        data = response.json()
+        logger.debug("Firebase token refresh successful")
+        # Secure Token API uses snake_case; normalize to the sign-in response keys.
+        return {
+            "idToken": data["id_token"],
+            "refreshToken": data["refresh_token"],
+            "expiresIn": data["expires_in"],
+            "localId": data.get("user_id"),
+        }
+
+    try:
+        err_body = response.json()
+        error = err_body.get("error", {})
+        msg = error.get("message", response.text)
+        code = error.get("message")
+    except Exception:
+        msg = response.text or f"HTTP {response.status_code}"
+        code = None
+
+    logger.warning(f"Firebase token refresh failed: {code or msg}")
+    raise FirebaseLoginError(msg, code=code)
@@ -185,7 +185,12 @@ async def lookup_game_for_visit(visit: VisitResponse) -> VisitGameResponse:
 async def enrich_visits_with_game_scores(
     visits: list[VisitResponse],
 ) -> list[VisitResponse]:
-    """Attach NHL scores; parallel fetch per unique visit_date in the batch."""
+    """
+    Attach NHL scores in place; parallel fetch per unique visit_date in the batch.
+
+    The visits are freshly built per request, so ``game`` is set on them directly
+    rather than copying every model.
+    """
     if not visits:
         return visits
 
@@ -193,7 +198,6 @@ async def enrich_visits_with_game_scores(
     unique_dates = {visit.visit_date for visit in visits}
     await prefetch_schedules_for_dates(unique_dates, cache)
 
-    enriched: list[VisitResponse] = []
     for visit in visits:
         games = cache.get(visit.visit_date.isoformat(), [])
         game = find_game_for_matchup(
@@ -201,11 +205,10 @@ async def enrich_visits_with_game_scores(
             visit.home_team.abbreviation,
             visit.away_team.abbreviation,
         )
-        score = game_to_visit_score(
+        visit.game = game_to_visit_score(
             game,
             home_abbrev=visit.home_team.abbreviation,
             away_abbrev=visit.away_team.abbreviation,
         )
-        enriched.append(visit.model_copy(update={"game": score}))
 
-    return enriched
+    return visits
@@ -0,0 +1,210 @@
+"""Deferred, coalescing writer for Firebase profile-claim changes.
+
+Authenticated requests only read the ``users`` row. When a token's email, name or
+picture differs from what is stored, the change is queued here instead of being
+written on the request path. Changes for the same uid are merged, and a background
+task writes everything pending in batched ``UPDATE`` statements once per interval,
+so a burst of requests from one user costs at most one write per flush window.
+
+If the database rejects the batch (e.g. a new email that collides with another
+user's), the flush falls back to one SAVEPOINT per user so only the offending rows
+fail. Those are retried a few times and then dropped.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from functools import lru_cache
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany batch.
+_MAX_BATCH_SIZE = 500
+# Flushes a user's change may be rejected by the database before it is dropped.
+_MAX_ATTEMPTS = 3
+# Errors caused by a row's values rather than the connection or the database.
+_ROW_ERRORS = (IntegrityError, DataError)
+
+_users = User.__table__
+# NULL parameters keep the stored value, so one statement covers any subset of fields.
+_SYNC_PROFILE = (
+    update(_users)
+    .where(_users.c.firebase_uid == bindparam("p_firebase_uid"))
+    .values(
+        email=func.coalesce(bindparam("p_email", type_=_users.c.email.type), _users.c.email),
+        display_name=func.coalesce(
+            bindparam("p_display_name", type_=_users.c.display_name.type),
+            _users.c.display_name,
+        ),
+        photo_url=func.coalesce(
+            bindparam("p_photo_url", type_=_users.c.photo_url.type), _users.c.photo_url
+        ),
+        updated_at=func.now(),
+    )
+)
+
+
+class ProfileSyncWriter:
+    """
+    Queue of pending profile changes keyed by Firebase uid, flushed on an interval.
+
+    Only touched from the event loop. A failed flush puts its changes back (newer
+    queued values win) and they are retried on the next interval. A user whose
+    row the database keeps rejecting is dropped after ``_MAX_ATTEMPTS`` flushes and
+    reported to ``on_dropped``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        interval_seconds: float = 5.0,
+        on_dropped: Callable[[str], None] | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.on_dropped = on_dropped
+        self._pending: dict[str, dict[str, str]] = {}
+        self._attempts: dict[str, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, firebase_uid: str, changes: dict[str, str]) -> None:
+        """Queue profile field changes; later values for a field replace earlier ones."""
+        if changes:
+            self._pending[firebase_uid] = {**self._pending.get(firebase_uid, {}), **changes}
+
+    async def flush(self) -> int:
+        """Write every pending change now. Returns the number of users written."""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                async with self.session_factory() as db:
+                    try:
+                        params = [_params(uid, changes) for uid, changes in batch.items()]
+                        for start in range(0, len(params), _MAX_BATCH_SIZE):
+                            await db.execute(_SYNC_PROFILE, params[start:start + _MAX_BATCH_SIZE])
+                        await db.commit()
+                        written = list(batch)
+                    except _ROW_ERRORS as e:
+                        logger.info("Profile sync batch rejected, writing rows one by one: %s", e)
+                        await db.rollback()
+                        written = await self._write_rows(db, batch)
+            except Exception:
+                for uid, changes in batch.items():
+                    self._requeue(uid, changes)
+                raise
+            for uid in written:
+                self._attempts.pop(uid, None)
+            logger.debug("Synced Firebase profile claims for %d users", len(written))
+            return len(written)
+
+    async def _write_rows(self, db: AsyncSession, batch: dict[str, dict[str, str]]) -> list[str]:
+        """One SAVEPOINT per user, so a row the database rejects does not sink the rest."""
+        written, rejected = [], {}
+        for uid, changes in batch.items():
+            try:
+                async with db.begin_nested():
+                    await db.execute(_SYNC_PROFILE, [_params(uid, changes)])
+            except _ROW_ERRORS as e:
+                rejected[uid] = (changes, e)
+            else:
+                written.append(uid)
+        await db.commit()
+        for uid, (changes, error) in rejected.items():
+            self._reject(uid, changes, error)
+        return written
+
+    def _reject(self, uid: str, changes: dict[str, str], error: Exception) -> None:
+        attempts = self._attempts.get(uid, 0) + 1
+        if attempts < _MAX_ATTEMPTS:
+            self._attempts[uid] = attempts
+            self._requeue(uid, changes)
+            return
+        self._attempts.pop(uid, None)
+        logger.warning(
+            "Dropping profile sync for %s after %d rejected attempts: %s", uid, attempts, error
+        )
+        if self.on_dropped is not None:
+            self.on_dropped(uid)
+
+    def _requeue(self, uid: str, changes: dict[str, str]) -> None:
+        # Changes queued since the flush started are newer and win.
+        self._pending[uid] = {**changes, **self._pending.get(uid, {})}
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Profile sync flush failed (%d users pending): %s", self.pending, e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop(), name="profile-sync")
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still queued."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(
+                "Final profile sync flush failed; %d users not written: %s", self.pending, e
+            )
+
+
+def _params(uid: str, changes: dict[str, str]) -> dict[str, str | None]:
+    return {
+        "p_firebase_uid": uid,
+        "p_email": changes.get("email"),
+        "p_display_name": changes.get("display_name"),
+        "p_photo_url": changes.get("photo_url"),
+    }
+
+
+@lru_cache()
+def get_profile_sync_writer() -> ProfileSyncWriter:
+    """Process-wide profile sync writer."""
+    # user_service imports this module; import lazily to avoid the cycle.
+    from app.services.user_service import invalidate_user_identity
+
+    return ProfileSyncWriter(
+        AsyncSessionLocal,
+        interval_seconds=get_settings().profile_sync_interval_seconds,
+        # The cached identity already shows the dropped values; re-read the row.
+        on_dropped=invalidate_user_identity,
+    )
+
+
+def start_profile_sync() -> None:
+    """Start the background flush task (called on application startup)."""
+    if get_settings().profile_sync_deferred:
+        get_profile_sync_writer().start()
+
+
+async def stop_profile_sync() -> None:
+    """Flush pending changes and stop the background task (called on shutdown)."""
+    if get_profile_sync_writer.cache_info().currsize:
+        await get_profile_sync_writer().stop()
@@ -0,0 +1,158 @@
+"""In-process snapshot of the team and arena reference tables.
+
+There are a few dozen teams and arenas and they change only when the seed script
+runs, so visit responses are assembled from a snapshot held in memory instead of
+loading ``home_team``, ``away_team`` and ``arena`` for every visit query. The
+snapshot is reloaded after ``REFERENCE_DATA_TTL_SECONDS`` or as soon as a visit
+refers to an id it does not contain (e.g. a team seeded after the last load).
+"""
+
+import time
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.singleflight import SingleFlight
+from app.models import Arena, Team
+from app.schemas import ArenaResponse, TeamResponse
+
+
+class VisitReferences(Protocol):
+    """Anything carrying a visit's reference ids (ORM row or column projection)."""
+
+    arena_id: uuid.UUID
+    home_team_id: uuid.UUID
+    away_team_id: uuid.UUID
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Immutable teams/arenas by id. ``version`` increases whenever the content changes."""
+
+    version: int
+    teams: Mapping[uuid.UUID, TeamResponse] = field(default_factory=dict)
+    arenas: Mapping[uuid.UUID, ArenaResponse] = field(default_factory=dict)
+
+    def covers(self, team_ids: Iterable[uuid.UUID], arena_ids: Iterable[uuid.UUID]) -> bool:
+        return all(t in self.teams for t in team_ids) and all(a in self.arenas for a in arena_ids)
+
+
+class ReferenceData:
+    """
+    Holds the current :class:`ReferenceSnapshot` and reloads it when stale.
+
+    Concurrent reloads are coalesced; the loading request's session runs the two
+    SELECTs. Readers always get a complete snapshot, never a partly updated one.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._snapshot: ReferenceSnapshot | None = None
+        self._loaded_at = 0.0
+        self._reloads: SingleFlight[str, ReferenceSnapshot] = SingleFlight()
+
+    @property
+    def snapshot(self) -> ReferenceSnapshot | None:
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next read to reload."""
+        self._loaded_at = float("-inf")
+
+    async def current(self, db: AsyncSession) -> ReferenceSnapshot:
+        """The snapshot, reloaded first if it is missing or older than the TTL."""
+        snapshot = self._snapshot
+        if snapshot is None or self._clock() - self._loaded_at >= self.ttl_seconds:
+            snapshot = await self.reload(db)
+        return snapshot
+
+    async def for_ids(
+        self,
+        db: AsyncSession,
+        *,
+        team_ids: Iterable[uuid.UUID] = (),
+        arena_ids: Iterable[uuid.UUID] = (),
+        miss_reload_min_age: float = 0.0,
+    ) -> ReferenceSnapshot:
+        """
+        A snapshot containing every given id if the database has them (one reload at most).
+
+        A missing id triggers a reload only when the snapshot is at least
+        ``miss_reload_min_age`` seconds old, so ids that may simply not exist (client
+        input) cannot force a reload on every request.
+        """
+        team_ids, arena_ids = set(team_ids), set(arena_ids)
+        if not team_ids and not arena_ids:
+            return self._snapshot or ReferenceSnapshot(version=0)
+        snapshot = await self.current(db)
+        if (
+            not snapshot.covers(team_ids, arena_ids)
+            and self._clock() - self._loaded_at >= miss_reload_min_age
+        ):
+            snapshot = await self.reload(db)
+        return snapshot
+
+    async def reload(self, db: AsyncSession) -> ReferenceSnapshot:
+        return await self._reloads.do("reference", lambda: self._load(db))
+
+    async def _load(self, db: AsyncSession) -> ReferenceSnapshot:
+        teams = {
+            team.id: TeamResponse.model_validate(team)
+            for team in (await db.execute(select(Team))).scalars()
+        }
+        arenas = {
+            arena.id: ArenaResponse.model_validate(arena)
+            for arena in (await db.execute(select(Arena))).scalars()
+        }
+        previous = self._snapshot
+        if previous is not None and previous.teams == teams and previous.arenas == arenas:
+            snapshot = previous
+        else:
+            version = previous.version + 1 if previous is not None else 1
+            snapshot = ReferenceSnapshot(version=version, teams=teams, arenas=arenas)
+        self._snapshot = snapshot
+        self._loaded_at = self._clock()
+        return snapshot
+
+
+@lru_cache()
+def get_reference_data() -> ReferenceData:
+    """Process-wide reference data snapshot holder."""
+    return ReferenceData(get_settings().reference_data_ttl_seconds)
+
+
+async def reference_for_ids(
+    db: AsyncSession,
+    *,
+    team_ids: Iterable[uuid.UUID] = (),
+    arena_ids: Iterable[uuid.UUID] = (),
+    miss_reload_min_age: float = 0.0,
+) -> ReferenceSnapshot:
+    """Process-wide snapshot, reloaded if needed to contain the given ids."""
+    return await get_reference_data().for_ids(
+        db, team_ids=team_ids, arena_ids=arena_ids, miss_reload_min_age=miss_reload_min_age
+    )
+
+
+async def reference_for_visits(
+    db: AsyncSession, visits: Iterable[VisitReferences]
+) -> ReferenceSnapshot:
+    """Reference snapshot that can resolve every team and arena of ``visits``."""
+    visits = list(visits)
+    return await reference_for_ids(
+        db,
+        team_ids=[t for v in visits for t in (v.home_team_id, v.away_team_id)],
+        arena_ids=[v.arena_id for v in visits],
+    )
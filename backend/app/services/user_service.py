@@ -1,26 +1,162 @@
 """Service layer for user operations."""
 
-from sqlalchemy import select
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import exists, func, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import FirebaseUser
+from app.core.cache import CacheStats, TTLCache
+from app.core.config import get_settings
+from app.core.singleflight import SingleFlight
 from app.models.user import User
+from app.services.profile_sync import get_profile_sync_writer
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """Session-independent snapshot of a ``users`` row, safe to cache across requests."""
+
+    id: uuid.UUID
+    firebase_uid: str
+    email: str
+    display_name: str | None
+    photo_url: str | None
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserIdentity":
+        return cls(
+            id=user.id,
+            firebase_uid=user.firebase_uid,
+            email=user.email,
+            display_name=user.display_name,
+            photo_url=user.photo_url,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_session(cls, firebase_user: FirebaseUser) -> "UserIdentity":
+        """Identity carried by a verified backend session token (no DB read)."""
+        return cls(
+            id=firebase_user.app_user_id,
+            firebase_uid=firebase_user.uid,
+            email=firebase_user.email or "",
+            display_name=firebase_user.name,
+            photo_url=firebase_user.picture,
+            created_at=firebase_user.app_user_created_at,
+        )
+
+
+# Either form exposes the internal ``id`` that visit services need.
+AppUser = User | UserIdentity
+
+
+# One in-flight lookup/provisioning per Firebase uid.
+_user_provisioning: SingleFlight[str, UserIdentity] = SingleFlight()
+
+
+@lru_cache()
+def _identity_cache() -> TTLCache[str, UserIdentity]:
+    """Firebase uid -> UserIdentity for authenticated requests."""
+    settings = get_settings()
+    return TTLCache(settings.user_identity_cache_max_entries)
+
+
+async def resolve_user(db: AsyncSession, firebase_user: FirebaseUser) -> UserIdentity:
+    """
+    Resolve the app user for an authenticated request, usually without touching Postgres.
+
+    Cached identities are reused while the token's profile claims match them. With
+    ``PROFILE_SYNC_DEFERRED`` (the default) a changed claim is queued for the
+    background profile writer and applied to the cached identity, so the request
+    makes no write; otherwise it goes through :func:`get_or_create_user`, which syncs
+    the row. Cache misses read the row (inserting it only for a brand-new user).
+
+    Concurrent misses for the same uid (e.g. the dashboard's parallel requests right
+    after login) are coalesced: one request does the lookup or provisioning and the
+    others await its result.
+
+    Backend session tokens already carry the internal user id, so they resolve
+    without any lookup.
+    """
+    if firebase_user.app_user_id is not None:
+        return UserIdentity.from_session(firebase_user)
+
+    identity = _identity_cache().get(firebase_user.uid)
+    if identity is not None:
+        if not _profile_changes(identity, firebase_user):
+            return identity
+        if get_settings().profile_sync_deferred:
+            return _defer_profile_sync(identity, firebase_user)
+
+    return await _user_provisioning.do(
+        firebase_user.uid, lambda: _load_user_identity(db, firebase_user)
+    )
+
+
+async def _load_user_identity(db: AsyncSession, firebase_user: FirebaseUser) -> UserIdentity:
+    if get_settings().profile_sync_deferred:
+        user = await get_or_create_user(db, firebase_user, sync_profile=False)
+        return _defer_profile_sync(UserIdentity.from_user(user), firebase_user)
+
+    user = await get_or_create_user(db, firebase_user)
+    return _cache_identity(UserIdentity.from_user(user))
+
+
+def _defer_profile_sync(identity: UserIdentity, firebase_user: FirebaseUser) -> UserIdentity:
+    """Queue changed profile claims and return the identity as it will be once written."""
+    changes = _profile_changes(identity, firebase_user)
+    if changes:
+        get_profile_sync_writer().enqueue(firebase_user.uid, changes)
+        identity = replace(identity, **changes)
+    return _cache_identity(identity)
+
+
+def _cache_identity(identity: UserIdentity) -> UserIdentity:
+    ttl = get_settings().user_identity_cache_ttl_seconds
+    _identity_cache().set(identity.firebase_uid, identity, time.monotonic() + ttl)
+    return identity
+
+
+def invalidate_user_identity(firebase_uid: str) -> None:
+    """
+    Drop a cached identity so the next request re-reads the row.
+
+    Called when a deferred profile change that the cached identity already shows
+    is dropped without being written.
+    """
+    _identity_cache().invalidate(firebase_uid)
+
+
+def user_identity_cache_stats() -> CacheStats:
+    """Hit/miss counters and size of the uid -> user identity cache."""
+    return _identity_cache().stats()
 
 
 async def get_or_create_user(
-    db: AsyncSession, 
-    firebase_user: FirebaseUser
+    db: AsyncSession,
+    firebase_user: FirebaseUser,
+    *,
+    sync_profile: bool = True,
 ) -> User:
     """
     Get an existing user or create a new one from Firebase authentication.
-    
+
     This should be called after a user successfully authenticates with Firebase.
     It ensures the user exists in your local database.
-    
+
     Args:
         db: Database session
         firebase_user: Authenticated Firebase user from the token
-        
+        sync_profile: Write changed profile claims to an existing row. When False an
+            existing user is returned as stored and only new users are inserted.
+
     Returns:
         User model instance
     """
@@ -28,25 +164,79 @@ async def get_or_create_user(
     stmt = select(User).where(User.firebase_uid == firebase_user.uid)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
-    
-    if user:
-        # Update user information in case it changed in Firebase
-        user.email = firebase_user.email or user.email
-        user.display_name = firebase_user.name or user.display_name
-        user.photo_url = firebase_user.picture or user.photo_url
-        await db.commit()
-        await db.refresh(user)
+
+    # Returning users with an unchanged profile need only the read above; most
+    # requests take this path.
+    if user and (not sync_profile or not _profile_changes(user, firebase_user)):
         return user
-    
-    # Create new user
-    new_user = User(
+
+    # New user or changed profile: one upsert, safe against concurrent first logins
+    user = await upsert_user(db, firebase_user)
+    await db.commit()
+    return user
+
+
+async def upsert_user(db: AsyncSession, firebase_user: FirebaseUser) -> User:
+    """
+    Insert a user or sync their Firebase profile claims in a single statement.
+
+    Uses ``INSERT ... ON CONFLICT (firebase_uid) DO UPDATE`` so concurrent first
+    requests for the same uid cannot race into the unique constraint. Profile fields
+    are only written when a claim is set and differs from the stored value, and the
+    full row is returned either way. The caller owns the commit.
+    """
+    users = User.__table__
+    insert_stmt = insert(users).values(
         firebase_uid=firebase_user.uid,
         email=firebase_user.email or "",
         display_name=firebase_user.name,
         photo_url=firebase_user.picture,
     )
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-    return new_user
+    excluded = insert_stmt.excluded
+    # Same rule as _profile_changes: an unset claim keeps the stored value.
+    profile = {
+        "email": func.coalesce(func.nullif(excluded.email, ""), users.c.email),
+        "display_name": func.coalesce(excluded.display_name, users.c.display_name),
+        "photo_url": func.coalesce(excluded.photo_url, users.c.photo_url),
+    }
+    upserted = (
+        insert_stmt.on_conflict_do_update(
+            index_elements=[users.c.firebase_uid],
+            set_={**profile, "updated_at": func.now()},
+            where=or_(*(users.c[key].is_distinct_from(value) for key, value in profile.items())),
+        )
+        .returning(*users.c)
+        .cte("upserted")
+    )
+    # ON CONFLICT ... WHERE returns nothing when no field changed; fall back to the
+    # existing row within the same statement.
+    existing = select(users).where(
+        users.c.firebase_uid == firebase_user.uid,
+        ~exists(select(upserted.c.id)),
+    )
+    stmt = (
+        select(User)
+        .from_statement(union_all(select(upserted), existing))
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    user = result.scalar_one_or_none()
+    if user is None:
+        # The conflicting row was committed after this statement's snapshot was taken.
+        result = await db.execute(select(User).where(User.firebase_uid == firebase_user.uid))
+        user = result.scalar_one()
+    return user
+
 
+def _profile_changes(user: AppUser, firebase_user: FirebaseUser) -> dict[str, str]:
+    """Profile fields whose Firebase claim is set and differs from the stored row."""
+    claims = {
+        "email": firebase_user.email,
+        "display_name": firebase_user.name,
+        "photo_url": firebase_user.picture,
+    }
+    return {
+        key: value
+        for key, value in claims.items()
+        if value and value != getattr(user, key)
+    }
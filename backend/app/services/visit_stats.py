@@ -0,0 +1,298 @@
+"""Incrementally maintained per-user visit stats.
+
+``user_visit_stats`` holds the home-screen counters and is read with a primary-key
+lookup. ``user_team_visit_counts`` and ``user_arena_visit_counts`` are per-user
+multisets (how many visits involved each team / arena) that let a single visit
+change tell whether a team or arena was seen for the first time or no longer.
+
+Visit writes call :func:`apply_visit_stats_delta` in their own transaction, so the
+counters commit or roll back with the visit. :func:`find_visit_stats_drift` and
+:func:`rebuild_visit_stats` recompute everything from ``visits``
+(``python -m app.scripts.rebuild_visit_stats``).
+"""
+
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from sqlalchemy import and_, delete, func, insert, select, text, true
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import UserArenaVisitCount, UserTeamVisitCount, UserVisitStats, Visit
+from app.schemas.stats import VisitStatsResponse
+
+_stats = UserVisitStats.__table__
+_team_counts = UserTeamVisitCount.__table__
+_arena_counts = UserArenaVisitCount.__table__
+
+
+class VisitKeys(NamedTuple):
+    """The visit columns the stats depend on."""
+
+    arena_id: uuid.UUID
+    home_team_id: uuid.UUID
+    away_team_id: uuid.UUID
+
+    @classmethod
+    def of(cls, visit: Visit) -> "VisitKeys":
+        return cls(visit.arena_id, visit.home_team_id, visit.away_team_id)
+
+
+@dataclass(frozen=True)
+class StatsDrift:
+    """A user whose stored stats disagree with their visits."""
+
+    user_id: uuid.UUID
+    stored: VisitStatsResponse | None
+    expected: VisitStatsResponse | None
+    team_count_mismatches: int = 0
+    arena_count_mismatches: int = 0
+
+
+async def get_visit_stats(db: AsyncSession, user_id: uuid.UUID) -> VisitStatsResponse:
+    """Stored counters for a user; a user without visits has no row (all zeros)."""
+    stmt = select(
+        _stats.c.total_visits, _stats.c.teams_seen, _stats.c.arenas_visited
+    ).where(_stats.c.user_id == user_id)
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        return VisitStatsResponse(total_visits=0, teams_seen=0, arenas_visited=0)
+    return VisitStatsResponse(
+        total_visits=row.total_visits,
+        teams_seen=row.teams_seen,
+        arenas_visited=row.arenas_visited,
+    )
+
+
+async def apply_visit_stats_delta(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    *,
+    added: Iterable[VisitKeys] = (),
+    removed: Iterable[VisitKeys] = (),
+) -> None:
+    """
+    Update a user's stats for visits being created (``added``), deleted
+    (``removed``), or changed (old keys removed, new keys added).
+
+    Runs in the caller's transaction; the caller commits. Upserts lock the user's
+    counter rows, so concurrent writes for the same user serialize correctly.
+    """
+    added, removed = list(added), list(removed)
+    team_deltas: Counter[uuid.UUID] = Counter()
+    arena_deltas: Counter[uuid.UUID] = Counter()
+    for keys, sign in [(k, 1) for k in added] + [(k, -1) for k in removed]:
+        team_deltas[keys.home_team_id] += sign
+        team_deltas[keys.away_team_id] += sign
+        arena_deltas[keys.arena_id] += sign
+
+    total_delta = len(added) - len(removed)
+    teams_delta = await _apply_count_deltas(db, _team_counts, "team_id", user_id, team_deltas)
+    arenas_delta = await _apply_count_deltas(db, _arena_counts, "arena_id", user_id, arena_deltas)
+    if not (total_delta or teams_delta or arenas_delta):
+        return
+
+    stmt = pg_insert(_stats).values(
+        user_id=user_id,
+        total_visits=total_delta,
+        teams_seen=teams_delta,
+        arenas_visited=arenas_delta,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[_stats.c.user_id],
+            set_={
+                "total_visits": _stats.c.total_visits + stmt.excluded.total_visits,
+                "teams_seen": _stats.c.teams_seen + stmt.excluded.teams_seen,
+                "arenas_visited": _stats.c.arenas_visited + stmt.excluded.arenas_visited,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def _apply_count_deltas(
+    db: AsyncSession,
+    table,
+    key: str,
+    user_id: uuid.UUID,
+    deltas: Counter[uuid.UUID],
+) -> int:
+    """
+    Add ``deltas`` to a multiset table and drop rows that reach zero.
+
+    Returns the change in the number of distinct keys (rows) for the user.
+    """
+    deltas = {k: d for k, d in deltas.items() if d}
+    if not deltas:
+        return 0
+
+    # Sorted so concurrent writers lock rows in the same order.
+    rows = [{"user_id": user_id, key: k, "visits": deltas[k]} for k in sorted(deltas)]
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c[key]],
+        set_={"visits": table.c.visits + stmt.excluded.visits},
+    ).returning(table.c[key], table.c.visits)
+    result = await db.execute(stmt)
+
+    distinct_delta = 0
+    emptied = []
+    for k, visits in result.all():
+        before = visits - deltas[k]
+        distinct_delta += (visits > 0) - (before > 0)
+        if visits <= 0:
+            emptied.append(k)
+    if emptied:
+        await db.execute(
+            delete(table).where(table.c.user_id == user_id, table.c[key].in_(emptied))
+        )
+    return distinct_delta
+
+
+def computed_visit_stats_stmt(user_id: uuid.UUID | None = None):
+    """
+    (user_id, total visits, distinct teams, distinct arenas) computed from raw visits
+    in one pass, for every user or just ``user_id``.
+
+    Each visit is expanded into its home and away team ids (ordinality 1 and 2), so
+    counting side 1 counts each visit once.
+    """
+    teams = (
+        func.unnest(array([Visit.home_team_id, Visit.away_team_id]))
+        .table_valued("team_id", with_ordinality="side")
+        .render_derived(name="teams")
+        .lateral()
+    )
+    stmt = (
+        select(
+            Visit.user_id,
+            func.count().filter(teams.c.side == 1).label("total_visits"),
+            func.count(func.distinct(teams.c.team_id)).label("teams_seen"),
+            func.count(func.distinct(Visit.arena_id)).label("arenas_visited"),
+        )
+        .select_from(Visit)
+        .join(teams, true())
+        .group_by(Visit.user_id)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Visit.user_id == user_id)
+    return stmt
+
+
+def _expected_team_counts():
+    teams = (
+        func.unnest(array([Visit.home_team_id, Visit.away_team_id]))
+        .table_valued("team_id")
+        .render_derived(name="teams")
+        .lateral()
+    )
+    return (
+        select(Visit.user_id, teams.c.team_id, func.count().label("visits"))
+        .select_from(Visit)
+        .join(teams, true())
+        .group_by(Visit.user_id, teams.c.team_id)
+    )
+
+
+def _expected_arena_counts():
+    return select(Visit.user_id, Visit.arena_id, func.count().label("visits")).group_by(
+        Visit.user_id, Visit.arena_id
+    )
+
+
+async def _multiset_mismatches(db: AsyncSession, expected_stmt, table, key: str) -> dict:
+    """Per-user number of keys whose stored count differs from the expected one."""
+    expected = expected_stmt.subquery()
+    joined = expected.join(
+        table,
+        and_(expected.c.user_id == table.c.user_id, expected.c[key] == table.c[key]),
+        full=True,
+    )
+    user_id = func.coalesce(expected.c.user_id, table.c.user_id)
+    stmt = (
+        select(user_id, func.count())
+        .select_from(joined)
+        .where(expected.c.visits.is_distinct_from(table.c.visits))
+        .group_by(user_id)
+    )
+    return dict((await db.execute(stmt)).tuples().all())
+
+
+async def find_visit_stats_drift(db: AsyncSession) -> list[StatsDrift]:
+    """Compare every user's stored stats and multisets with their visits."""
+
+    def _response(row) -> VisitStatsResponse:
+        return VisitStatsResponse(
+            total_visits=row.total_visits,
+            teams_seen=row.teams_seen,
+            arenas_visited=row.arenas_visited,
+        )
+
+    expected = {
+        row.user_id: _response(row)
+        for row in (await db.execute(computed_visit_stats_stmt())).all()
+    }
+    stored_stmt = select(
+        _stats.c.user_id, _stats.c.total_visits, _stats.c.teams_seen, _stats.c.arenas_visited
+    )
+    zero = VisitStatsResponse(total_visits=0, teams_seen=0, arenas_visited=0)
+    stored = {
+        row.user_id: _response(row)
+        for row in (await db.execute(stored_stmt)).all()
+        if _response(row) != zero
+    }
+    team_mismatches = await _multiset_mismatches(
+        db, _expected_team_counts(), _team_counts, "team_id"
+    )
+    arena_mismatches = await _multiset_mismatches(
+        db, _expected_arena_counts(), _arena_counts, "arena_id"
+    )
+
+    drift = []
+    user_ids = set(expected) | set(stored) | set(team_mismatches) | set(arena_mismatches)
+    for user_id in sorted(user_ids):
+        mismatch = StatsDrift(
+            user_id=user_id,
+            stored=stored.get(user_id),
+            expected=expected.get(user_id),
+            team_count_mismatches=team_mismatches.get(user_id, 0),
+            arena_count_mismatches=arena_mismatches.get(user_id, 0),
+        )
+        if (
+            mismatch.stored != mismatch.expected
+            or mismatch.team_count_mismatches
+            or mismatch.arena_count_mismatches
+        ):
+            drift.append(mismatch)
+    return drift
+
+
+async def rebuild_visit_stats(db: AsyncSession) -> None:
+    """
+    Recompute all stats tables from ``visits`` in the caller's transaction.
+
+    Takes a SHARE lock on ``visits`` so no visit is written mid-rebuild (reads
+    continue); the caller commits to release it.
+    """
+    await db.execute(text("LOCK TABLE visits IN SHARE MODE"))
+    for table in (_stats, _team_counts, _arena_counts):
+        await db.execute(delete(table))
+    await db.execute(
+        insert(_team_counts).from_select(["user_id", "team_id", "visits"], _expected_team_counts())
+    )
+    await db.execute(
+        insert(_arena_counts).from_select(
+            ["user_id", "arena_id", "visits"], _expected_arena_counts()
+        )
+    )
+    await db.execute(
+        insert(_stats).from_select(
+            ["user_id", "total_visits", "teams_seen", "arenas_visited"],
+            computed_visit_stats_stmt(),
+        )
+    )
@@ -1,218 +1,342 @@
 """Visits Services to GET/CREATE/UPDATE/DELETE visits."""
 
+import base64
+import binascii
+import json
 import uuid
+from datetime import date
 
-from app.core.exceptions import ResourceNotFoundError, VisitNotFoundError
-from app.db.session import delete, save
-from app.models import Arena, Team, User, Visit
-from app.schemas import (ArenaResponse, TeamResponse, VisitCreate,
-                         VisitResponse, VisitUpdate)
+from app.core.exceptions import (ResourceNotFoundError, ValidationError,
+                                 VisitNotFoundError)
+from app.db.session import save
+from app.models import Visit
+from app.schemas import VisitCreate, VisitResponse, VisitUpdate
 from app.schemas.stats import VisitStatsResponse
-from sqlalchemy import func, select, union_all
+from app.services.reference_data import (ReferenceSnapshot, reference_for_ids,
+                                         reference_for_visits)
+from app.services.user_service import AppUser
+from app.services.visit_stats import (VisitKeys, apply_visit_stats_delta,
+                                      get_visit_stats)
+from sqlalchemy import Row, and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-# Eager loads for VisitResponse (home/away teams + arena); keep list and single GET in sync.
-_VISIT_RELATION_LOADS = (
-    selectinload(Visit.home_team),
-    selectinload(Visit.away_team),
-    selectinload(Visit.arena),
+# Everything VisitResponse needs; list/detail reads select these as plain rows, so
+# no ORM entities (identity map, change tracking) are built for read-only requests.
+_VISIT_COLUMNS = (
+    Visit.id,
+    Visit.arena_id,
+    Visit.home_team_id,
+    Visit.away_team_id,
+    Visit.visit_date,
+    Visit.seating_location,
+    Visit.created_at,
+    Visit.updated_at,
 )
 
+# Teams/arenas are validated against the reference snapshot. An id it lacks reloads
+# the snapshot at most this often, so bogus ids in requests cannot force reloads.
+_UNKNOWN_REFERENCE_RELOAD_SECONDS = 1.0
 
-async def get_user_visit_stats(user: User, db: AsyncSession) -> VisitStatsResponse:
+
+async def get_user_visit_stats(user: AppUser, db: AsyncSession) -> VisitStatsResponse:
     """
-    Get counts for a users visits, teams seen, and arenas seen, without loading \
-    full visit data.
+    Get counts for a users visits, teams seen, and arenas seen from the \
+    maintained user_visit_stats row (a primary-key lookup).
     """
 
-    total = await _count_visits_for_user(user, db)
-
-    team_ids = union_all(
-        select(Visit.home_team_id.label("team_id")).where(Visit.user_id == user.id),
-        select(Visit.away_team_id.label("team_id")).where(Visit.user_id == user.id),
-    ).subquery()
-
-    teams_stmt = select(func.count(func.distinct(team_ids.c.team_id)))
-    teams_result = await db.execute(teams_stmt)
-    teams_seen = teams_result.scalar_one() or 0
-
-    arenas_stmt = select(func.count(func.distinct(Visit.arena_id))).where(
-        Visit.user_id == user.id
-    )
-    arenas_result = await db.execute(arenas_stmt)
-    arenas_visited = arenas_result.scalar_one() or 0
-
-    return VisitStatsResponse(
-        total_visits=total,
-        teams_seen=teams_seen,
-        arenas_visited=arenas_visited,
-    )
+    return await get_visit_stats(db, user.id)
 
 
 async def get_latest_visit_for_user(
-    user: User, db: AsyncSession
+    user: AppUser, db: AsyncSession
 ) -> VisitResponse | None:
     """Most recent visit by visit_date. Returns None if the user has no visits."""
 
-    visits = await _list_visits_for_user(user, db, skip=0, limit=1)
+    visits, _ = await _list_visits_for_user(user, db, skip=0, limit=1)
     if not visits:
         return None
-    return VisitResponse.model_validate(visits[0])
+    return (await _visit_responses(db, visits))[0]
 
 
 async def get_users_visits(
-    user: User, db: AsyncSession, skip: int, limit: int
-) -> tuple[list[VisitResponse], int]:
-    """List paginated visits for a user, newest visit_date first, with total count."""
+    user: AppUser,
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[VisitResponse], int | None, str | None]:
+    """
+    List paginated visits for a user, newest visit_date first, with total count.
+
+    Pages either by ``skip`` (OFFSET) or by an opaque ``cursor`` from a previous
+    page's ``next_cursor``, which resumes right after that page's last visit.
+    ``next_cursor`` is None on the last page.
+
+    The total comes back with the page in the same statement; pass
+    ``include_total=False`` to skip counting (total is then None).
+    """
+
+    after = decode_visit_cursor(cursor) if cursor else None
+    # One extra row tells us whether another page exists.
+    visits, total = await _list_visits_for_user(
+        user, db, skip, limit + 1, after=after, with_total=include_total
+    )
+    if include_total and total is None:
+        # Empty page: nothing carried the count. A first page is simply empty;
+        # past the end (or after a cursor) the user may still have visits.
+        total = 0 if skip == 0 and after is None else await _count_visits_for_user(user, db)
+
+    next_cursor = None
+    if len(visits) > limit:
+        visits = visits[:limit]
+        next_cursor = encode_visit_cursor(visits[-1].visit_date, visits[-1].id)
+
+    return await _visit_responses(db, visits), total, next_cursor
 
-    total = await _count_visits_for_user(user, db)
-    visits = await _list_visits_for_user(user, db, skip, limit)
 
-    return [VisitResponse.model_validate(v) for v in visits], total
+def encode_visit_cursor(visit_date: date, visit_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the position just after ``(visit_date, visit_id)``."""
+    payload = json.dumps({"d": visit_date.isoformat(), "id": str(visit_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_visit_cursor(cursor: str) -> tuple[date, uuid.UUID]:
+    """Inverse of :func:`encode_visit_cursor`; raises ValidationError for bad input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return date.fromisoformat(payload["d"]), uuid.UUID(payload["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValidationError("Invalid cursor") from e
 
 
 async def get_visit_by_id_for_user(
-    visit_id: uuid.UUID, user: User, db: AsyncSession
+    visit_id: uuid.UUID, user: AppUser, db: AsyncSession
 ) -> VisitResponse:
     """Return one visit if it exists and belongs to the user."""
 
-    visit = await _get_visit_for_user(visit_id, user, db)
-    return VisitResponse.model_validate(visit)
+    stmt = select(*_VISIT_COLUMNS).where(Visit.id == visit_id, Visit.user_id == user.id)
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        raise VisitNotFoundError()
+    return (await _visit_responses(db, [row]))[0]
 
 
-async def create_new_visit(visit: VisitCreate, user: User, db: AsyncSession) -> VisitResponse:
-    """Create a new visit for the current user."""
+async def create_new_visit(visit: VisitCreate, user: AppUser, db: AsyncSession) -> VisitResponse:
+    """
+    Create a new visit for the current user.
 
-    home_team = await db.get(Team, visit.home_team_id)
-    away_team = await db.get(Team, visit.away_team_id)
-    arena = await db.get(Arena, visit.arena_id)
+    The visit row is inserted before the stats counters are touched, the same order
+    PATCH and DELETE use (write visits, then stats), so a concurrent stats rebuild,
+    which locks visits before rewriting the counters, cannot deadlock with it.
+    """
 
-    _validate_teams_and_arena(home_team, away_team, arena)
+    reference = await _validate_references(db, visit.model_dump())
 
     new_visit = Visit(
         user_id=user.id,
-        arena_id=arena.id,
-        home_team_id=home_team.id,
-        away_team_id=away_team.id,
+        arena_id=visit.arena_id,
+        home_team_id=visit.home_team_id,
+        away_team_id=visit.away_team_id,
         visit_date=visit.visit_date,
         seating_location=visit.seating_location,
     )
+    db.add(new_visit)
+    await db.flush()
+    await apply_visit_stats_delta(db, user.id, added=[VisitKeys.of(new_visit)])
     saved_visit = await save(new_visit, db)
 
-    return VisitResponse(
-        id=saved_visit.id,
-        home_team=TeamResponse.model_validate(home_team),
-        away_team=TeamResponse.model_validate(away_team),
-        arena=ArenaResponse.model_validate(arena),
-        visit_date=saved_visit.visit_date,
-        seating_location=saved_visit.seating_location,
-        created_at=saved_visit.created_at,
-        updated_at=saved_visit.updated_at
-    )
+    return _visit_response(saved_visit, reference)
+
 
 async def update_visit_for_user(
     visit_id: uuid.UUID,
     payload: VisitUpdate,
-    user: User,
+    user: AppUser,
     db: AsyncSession,
 ) -> VisitResponse:
-    """Apply a partial update to a visit owned by the user."""
+    """
+    Apply a partial update to a visit owned by the user.
 
-    visit = await _get_visit_for_user(visit_id, user, db)
+    One ``UPDATE ... RETURNING`` scoped to the user's visit writes the change and
+    returns the new row; the response is built from it and the reference data.
+    """
 
     data = payload.model_dump(exclude_unset=True)
     if not data:
-        return VisitResponse.model_validate(visit)
+        return await get_visit_by_id_for_user(visit_id, user, db)
+
+    await _validate_references(db, data)
 
-    await _validate_patch_foreign_keys(db, data)
+    moves_stats = not data.keys().isdisjoint(VisitKeys._fields)
+    row = (await db.execute(_update_visit_stmt(visit_id, user, data, moves_stats))).one_or_none()
+    if row is None:
+        raise VisitNotFoundError()
 
-    for key, value in data.items():
-        setattr(visit, key, value)
+    if moves_stats:
+        old_keys = VisitKeys(row.old_arena_id, row.old_home_team_id, row.old_away_team_id)
+        new_keys = VisitKeys(row.arena_id, row.home_team_id, row.away_team_id)
+        if new_keys != old_keys:
+            await apply_visit_stats_delta(db, user.id, added=[new_keys], removed=[old_keys])
 
     await db.commit()
 
-    return await get_visit_by_id_for_user(visit_id, user, db)
+    return (await _visit_responses(db, [row]))[0]
 
 
-async def delete_visit_by_id(visit_id: uuid.UUID, user: User, db: AsyncSession) -> None:
-    """Delete a given visit if it belongs to the current user."""
+async def delete_visit_by_id(visit_id: uuid.UUID, user: AppUser, db: AsyncSession) -> None:
+    """
+    Delete a given visit if it belongs to the current user.
 
-    visit = await db.get(Visit, visit_id)
-    if visit is None or visit.user_id != user.id:
+    One ownership-scoped ``DELETE ... RETURNING`` removes the row (taking the
+    table's ROW EXCLUSIVE lock before any stats row is touched) and returns the
+    keys whose counters are then decremented.
+    """
+
+    stmt = (
+        delete(Visit)
+        .where(Visit.id == visit_id, Visit.user_id == user.id)
+        .returning(Visit.arena_id, Visit.home_team_id, Visit.away_team_id)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
         raise VisitNotFoundError()
 
-    await delete(visit, db)
+    await apply_visit_stats_delta(
+        db, user.id, removed=[VisitKeys(row.arena_id, row.home_team_id, row.away_team_id)]
+    )
+    await db.commit()
+
 
 # Helper functions
 async def _list_visits_for_user(
-    user: User, db: AsyncSession, skip: int, limit: int
-) -> list[Visit]:
-    """Paginated visits for a user, newest first, with the same relations as GET-by-id."""
+    user: AppUser,
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    after: tuple[date, uuid.UUID] | None = None,
+    with_total: bool = False,
+) -> tuple[list[Row], int | None]:
+    """
+    Paginated visits for a user, newest first, as rows of ``_VISIT_COLUMNS``.
+
+    Ordered by (visit_date DESC, id) so visits on the same date keep a stable order,
+    matching ix_visits_user_id_visit_date_id. ``after`` starts the page just past
+    that (visit_date, id) position instead of using OFFSET.
 
+    With ``with_total`` each row also carries the user's visit count as an
+    uncorrelated scalar subquery (evaluated once per statement), so the page and
+    the total share one round trip. The total is None when the page is empty.
+    """
+
+    columns = list(_VISIT_COLUMNS)
+    if with_total:
+        columns.append(_count_visits_stmt(user).scalar_subquery().label("total"))
     stmt = (
-        select(Visit)
+        select(*columns)
         .where(Visit.user_id == user.id)
-        .options(*_VISIT_RELATION_LOADS)
-        .order_by(Visit.visit_date.desc())
+        .order_by(Visit.visit_date.desc(), Visit.id)
         .offset(skip)
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if after is not None:
+        after_date, after_id = after
+        stmt = stmt.where(
+            or_(
+                Visit.visit_date < after_date,
+                and_(Visit.visit_date == after_date, Visit.id > after_id),
+            )
+        )
+    rows = list((await db.execute(stmt)).all())
+    if not with_total:
+        return rows, None
+    return rows, (rows[0].total if rows else None)
+
+
+def _update_visit_stmt(visit_id: uuid.UUID, user: AppUser, data: dict, with_old_keys: bool):
+    """
+    ``UPDATE visits ... RETURNING _VISIT_COLUMNS`` for the user's visit only.
 
+    With ``with_old_keys`` the row is first locked in a ``FOR UPDATE`` CTE that also
+    returns its previous arena/team ids, which the stats delta needs.
+    """
 
-async def _get_visit_for_user(
-    visit_id: uuid.UUID,
-    user: User,
-    db: AsyncSession,
-) -> Visit:
-    """Load one visit by id for this user with arena and teams (same graph as GET)."""
+    stmt = update(Visit).values(**data).execution_options(synchronize_session=False)
+    if not with_old_keys:
+        return stmt.where(Visit.id == visit_id, Visit.user_id == user.id).returning(
+            *_VISIT_COLUMNS
+        )
 
-    stmt = (
-        select(Visit)
+    old = (
+        select(Visit.id, Visit.arena_id, Visit.home_team_id, Visit.away_team_id)
         .where(Visit.id == visit_id, Visit.user_id == user.id)
-        .options(*_VISIT_RELATION_LOADS)
+        .with_for_update()
+        .cte("old")
     )
-    result = await db.execute(stmt)
-    visit = result.scalar_one_or_none()
-    if visit is None:
-        raise VisitNotFoundError()
-    return visit
+    return stmt.where(Visit.id == old.c.id).returning(
+        *_VISIT_COLUMNS,
+        old.c.arena_id.label("old_arena_id"),
+        old.c.home_team_id.label("old_home_team_id"),
+        old.c.away_team_id.label("old_away_team_id"),
+    )
+
+
+async def _visit_responses(
+    db: AsyncSession, visits: list[Row] | list[Visit]
+) -> list[VisitResponse]:
+    """Build responses, taking teams and arenas from the reference snapshot."""
 
+    reference = await reference_for_visits(db, visits)
+    return [_visit_response(visit, reference) for visit in visits]
 
-async def _count_visits_for_user(user: User, db: AsyncSession) -> int:
-    count_stmt = (
+
+def _visit_response(visit: Row | Visit, reference: ReferenceSnapshot) -> VisitResponse:
+    # Columns come typed from the database and teams/arenas are already-validated
+    # snapshot models, so skip validation.
+    return VisitResponse.model_construct(
+        id=visit.id,
+        home_team=reference.teams[visit.home_team_id],
+        away_team=reference.teams[visit.away_team_id],
+        arena=reference.arenas[visit.arena_id],
+        visit_date=visit.visit_date,
+        seating_location=visit.seating_location,
+        created_at=visit.created_at,
+        updated_at=visit.updated_at,
+    )
+
+
+def _count_visits_stmt(user: AppUser):
+    return (
         select(func.count())
         .select_from(Visit)
         .where(Visit.user_id == user.id)
     )
-    count_result = await db.execute(count_stmt)
-    return count_result.scalar_one()
 
 
-async def _validate_patch_foreign_keys(db: AsyncSession, data: dict) -> None:
-    """Ensure any ID fields in a PATCH body reference existing rows."""
+async def _count_visits_for_user(user: AppUser, db: AsyncSession) -> int:
+    count_result = await db.execute(_count_visits_stmt(user))
+    return count_result.scalar_one()
 
-    if "home_team_id" in data:
-        if await db.get(Team, data["home_team_id"]) is None:
-            raise ResourceNotFoundError("Home team not found")
-    if "away_team_id" in data:
-        if await db.get(Team, data["away_team_id"]) is None:
-            raise ResourceNotFoundError("Away team not found")
-    if "arena_id" in data:
-        if await db.get(Arena, data["arena_id"]) is None:
-            raise ResourceNotFoundError("Arena not found")
 
+async def _validate_references(db: AsyncSession, data: dict) -> ReferenceSnapshot:
+    """
+    Ensure any team/arena ids in a create or PATCH body exist, checked in memory
+    against the reference snapshot (no query unless it needs loading).
+    """
 
-def _validate_teams_and_arena(
-    home_team: Team | None,
-    away_team: Team | None,
-    arena: Arena | None,
-) -> None:
-    if home_team is None:
+    team_ids = [data[key] for key in ("home_team_id", "away_team_id") if key in data]
+    arena_ids = [data["arena_id"]] if "arena_id" in data else []
+    reference = await reference_for_ids(
+        db,
+        team_ids=team_ids,
+        arena_ids=arena_ids,
+        miss_reload_min_age=_UNKNOWN_REFERENCE_RELOAD_SECONDS,
+    )
+    if "home_team_id" in data and data["home_team_id"] not in reference.teams:
         raise ResourceNotFoundError("Home team not found")
-    if away_team is None:
+    if "away_team_id" in data and data["away_team_id"] not in reference.teams:
         raise ResourceNotFoundError("Away team not found")
-    if arena is None:
-        raise ResourceNotFoundError("Arena not found")
\ No newline at end of file
+    if "arena_id" in data and data["arena_id"] not in reference.arenas:
+        raise ResourceNotFoundError("Arena not found")
+    return reference
@@ -0,0 +1 @@
+"""Offline latency benchmarks (run against local stand-ins, no network)."""
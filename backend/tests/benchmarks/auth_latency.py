@@ -0,0 +1,116 @@
+"""
+Auth-path latency benchmark against the offline Firebase stand-in.
+
+Times the three calls on the login/request path: Identity Toolkit sign-in, the
+first ID token verification (signing keys not yet loaded) and warm verifications
+(keys in memory, token cache bypassed), so regressions show up in CI without
+touching Google.
+
+Run directly:
+  cd backend
+  python -m tests.benchmarks.auth_latency --iterations 200
+
+Optional environment variables:
+  AUTH_BENCH_ITERATIONS   Warm iterations per measurement (default: 50)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from unittest.mock import patch
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.token_verifier import FirebaseTokenVerifier, SigningKeyStore
+from app.services.firebase_login import sign_in_with_password
+from tests.fakes.firebase import FakeFirebase
+
+DEFAULT_ITERATIONS = 50
+BASE_URL = "http://firebase.bench"
+
+
+@dataclass
+class LatencySummary:
+    name: str
+    samples_ms: list[float]
+
+    @property
+    def p50(self) -> float:
+        return statistics.median(self.samples_ms)
+
+    @property
+    def p95(self) -> float:
+        ordered = sorted(self.samples_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<20} n={len(self.samples_ms):<5} "
+            f"p50={self.p50:8.3f} ms  p95={self.p95:8.3f} ms"
+        )
+
+
+async def _time(fn: Callable[[], Awaitable[object]]) -> float:
+    start = time.perf_counter()
+    await fn()
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_auth_benchmark(iterations: int = DEFAULT_ITERATIONS) -> list[LatencySummary]:
+    fake = FakeFirebase()
+    overrides = fake.settings_overrides(BASE_URL)
+    account = fake.add_account("bench@example.com", "bench-password")
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake.app), base_url=BASE_URL
+    ) as client:
+        with (
+            patch.multiple(get_settings(), **overrides),
+            patch("app.services.firebase_login.get_http_client", return_value=client),
+        ):
+            sign_in = [
+                await _time(
+                    lambda: sign_in_with_password(
+                        overrides["firebase_api_key"], account.email, account.password
+                    )
+                )
+                for _ in range(iterations)
+            ]
+
+        verifier = FirebaseTokenVerifier(
+            fake.project_id,
+            SigningKeyStore(overrides["firebase_certs_url"], client=client),
+        )
+        token = fake.mint_id_token(account)
+        cold = [await _time(lambda: verifier.verify(token))]
+        warm = [await _time(lambda: verifier.verify(token)) for _ in range(iterations)]
+
+    return [
+        LatencySummary("sign_in_with_password", sign_in),
+        LatencySummary("verify (cold keys)", cold),
+        LatencySummary("verify (warm keys)", warm),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=int(os.environ.get("AUTH_BENCH_ITERATIONS", DEFAULT_ITERATIONS)),
+    )
+    args = parser.parse_args()
+
+    for summary in asyncio.run(run_auth_benchmark(args.iterations)):
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
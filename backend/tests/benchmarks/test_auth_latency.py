@@ -0,0 +1,19 @@
+"""Pytest entry point for the offline auth latency benchmark."""
+
+import pytest
+
+from tests.benchmarks.auth_latency import run_auth_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.asyncio
+async def test_auth_benchmark_reports_each_stage() -> None:
+    summaries = await run_auth_benchmark(iterations=5)
+
+    assert [s.name for s in summaries] == [
+        "sign_in_with_password",
+        "verify (cold keys)",
+        "verify (warm keys)",
+    ]
+    assert all(s.p50 > 0 for s in summaries)
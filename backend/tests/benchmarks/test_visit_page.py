@@ -0,0 +1,14 @@
+"""Pytest entry point for the visit list page benchmark."""
+
+import pytest
+
+from tests.benchmarks.visit_page import run_visit_page_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_column_projection_allocates_less_per_page() -> None:
+    orm, columns = run_visit_page_benchmark(iterations=5)
+
+    assert (orm.name, columns.name) == ("orm", "columns")
+    assert columns.peak_kib < orm.peak_kib
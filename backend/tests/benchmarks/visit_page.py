@@ -0,0 +1,178 @@
+"""
+Visit list page benchmark: ORM entities vs. column projection.
+
+Builds 100-row visit pages both ways against an in-memory SQLite copy of the
+``visits`` table, so it measures only the client-side cost (row materialization
+and response building), not Postgres:
+
+  orm       select(Visit) entities -> validated VisitResponse -> model_copy(game)
+  columns   select(*_VISIT_COLUMNS) rows -> VisitResponse.model_construct, game set
+
+Run directly:
+  cd backend
+  python -m tests.benchmarks.visit_page --iterations 200
+
+Optional environment variables:
+  VISIT_PAGE_BENCH_ITERATIONS   Pages built per path (default: 50)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Engine, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Visit
+from app.schemas import ArenaResponse, TeamResponse, VisitResponse
+from app.services.reference_data import ReferenceSnapshot
+from app.services.visits import _VISIT_COLUMNS, _visit_response
+
+DEFAULT_ITERATIONS = 50
+PAGE_SIZE = 100
+
+
+@dataclass
+class PageSummary:
+    name: str
+    samples_ms: list[float]
+    peak_kib: float
+
+    @property
+    def p50(self) -> float:
+        return statistics.median(self.samples_ms)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<8} n={len(self.samples_ms):<5} "
+            f"p50={self.p50:8.3f} ms  peak={self.peak_kib:8.1f} KiB/page"
+        )
+
+
+def _setup() -> tuple[Engine, uuid.UUID, ReferenceSnapshot]:
+    teams = {
+        tid: TeamResponse(id=tid, name=f"Team {n}", abbreviation=f"T{n:02d}")
+        for n, tid in enumerate(uuid.uuid4() for _ in range(32))
+    }
+    arenas = {
+        aid: ArenaResponse(id=aid, name=f"Arena {n}")
+        for n, aid in enumerate(uuid.uuid4() for _ in range(32))
+    }
+    team_ids, arena_ids = list(teams), list(arenas)
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+
+    engine = create_engine("sqlite://")
+    Visit.__table__.create(engine)
+    with Session(engine) as session:
+        session.execute(
+            insert(Visit),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "arena_id": arena_ids[n % 32],
+                    "home_team_id": team_ids[n % 32],
+                    "away_team_id": team_ids[(n + 7) % 32],
+                    "visit_date": date(2024, 1, 1) - timedelta(days=n),
+                    "seating_location": f"Section {n % 300}",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for n in range(PAGE_SIZE)
+            ],
+        )
+        session.commit()
+    return engine, user_id, ReferenceSnapshot(version=1, teams=teams, arenas=arenas)
+
+
+def _orm_page(engine: Engine, user_id: uuid.UUID, reference: ReferenceSnapshot) -> list:
+    with Session(engine) as session:
+        visits = session.execute(
+            select(Visit)
+            .where(Visit.user_id == user_id)
+            .order_by(Visit.visit_date.desc(), Visit.id)
+            .limit(PAGE_SIZE)
+        ).scalars().all()
+        page = [
+            VisitResponse(
+                id=v.id,
+                home_team=reference.teams[v.home_team_id],
+                away_team=reference.teams[v.away_team_id],
+                arena=reference.arenas[v.arena_id],
+                visit_date=v.visit_date,
+                seating_location=v.seating_location,
+                created_at=v.created_at,
+                updated_at=v.updated_at,
+            )
+            for v in visits
+        ]
+        return [visit.model_copy(update={"game": None}) for visit in page]
+
+
+def _columns_page(engine: Engine, user_id: uuid.UUID, reference: ReferenceSnapshot) -> list:
+    with Session(engine) as session:
+        rows = session.execute(
+            select(*_VISIT_COLUMNS)
+            .where(Visit.user_id == user_id)
+            .order_by(Visit.visit_date.desc(), Visit.id)
+            .limit(PAGE_SIZE)
+        ).all()
+        page = [_visit_response(row, reference) for row in rows]
+        for visit in page:
+            visit.game = None
+        return page
+
+
+def _measure(name: str, build: Callable[[], list], iterations: int) -> PageSummary:
+    build()  # warm statement caches
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        page = build()
+        samples.append((time.perf_counter() - start) * 1000)
+        assert len(page) == PAGE_SIZE
+
+    tracemalloc.start()
+    try:
+        build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return PageSummary(name, samples, peak / 1024)
+
+
+def run_visit_page_benchmark(iterations: int = DEFAULT_ITERATIONS) -> list[PageSummary]:
+    engine, user_id, reference = _setup()
+    try:
+        return [
+            _measure("orm", lambda: _orm_page(engine, user_id, reference), iterations),
+            _measure("columns", lambda: _columns_page(engine, user_id, reference), iterations),
+        ]
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=int(os.environ.get("VISIT_PAGE_BENCH_ITERATIONS", DEFAULT_ITERATIONS)),
+    )
+    args = parser.parse_args()
+
+    for summary in run_visit_page_benchmark(args.iterations):
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Unit tests for the TTL/LRU cache."""
+
+from app.core.cache import CacheStats, TTLCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_value_until_expiry() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(10, clock=clock)
+    cache.set("a", 1, expires_at=clock.now + 5)
+
+    assert cache.get("a") == 1
+    clock.now += 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_entry() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(2, clock=clock)
+    cache.set("a", 1, expires_at=clock.now + 60)
+    cache.set("b", 2, expires_at=clock.now + 60)
+    cache.get("a")
+    cache.set("c", 3, expires_at=clock.now + 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_counts_hits_and_misses() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(10, clock=clock)
+    cache.set("a", 1, expires_at=clock.now + 60)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.stats() == CacheStats(hits=2, misses=1, size=1, max_entries=10)
+
+
+def test_zero_capacity_or_expired_values_are_not_stored() -> None:
+    clock = FakeClock()
+    disabled: TTLCache[str, int] = TTLCache(0, clock=clock)
+    disabled.set("a", 1, expires_at=clock.now + 60)
+    assert disabled.get("a") is None
+
+    cache: TTLCache[str, int] = TTLCache(10, clock=clock)
+    cache.set("a", 1, expires_at=clock.now)
+    assert len(cache) == 0
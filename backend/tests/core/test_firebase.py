@@ -0,0 +1,105 @@
+"""Unit tests for Firebase token verification helpers."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from app.core import firebase
+from app.core.config import get_settings
+from app.core.token_verifier import FirebaseTokenVerifier, SigningKeyStore
+
+from tests.fakes.securetoken import FAKE_CERTS_URL, FakeKeyServer
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    firebase._token_cache.cache_clear()
+    yield
+    firebase._token_cache.cache_clear()
+
+
+@pytest.fixture
+def admin_verifier(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "firebase_token_verifier", "admin")
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_token_async_runs_off_event_loop_thread(
+    admin_verifier: None,
+) -> None:
+    loop_thread = threading.get_ident()
+    seen: list[int] = []
+
+    def fake_verify(token: str) -> dict:
+        seen.append(threading.get_ident())
+        return {"uid": "uid-1", "token": token}
+
+    with patch("app.core.firebase.verify_firebase_token", side_effect=fake_verify):
+        decoded = await firebase.verify_firebase_token_async("abc")
+
+    assert decoded == {"uid": "uid-1", "token": "abc"}
+    assert seen and seen[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_token_async_propagates_errors(admin_verifier: None) -> None:
+    with patch(
+        "app.core.firebase.verify_firebase_token",
+        side_effect=ValueError("bad token"),
+    ):
+        with pytest.raises(ValueError, match="bad token"):
+            await firebase.verify_firebase_token_async("abc")
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_token_async_caches_claims_by_token(
+    admin_verifier: None,
+) -> None:
+    decoded = {"uid": "uid-1", "exp": time.time() + 600}
+
+    with patch(
+        "app.core.firebase.verify_firebase_token", return_value=decoded
+    ) as verify:
+        first = await firebase.verify_firebase_token_async("token-a")
+        second = await firebase.verify_firebase_token_async("token-a")
+        await firebase.verify_firebase_token_async("token-b")
+
+    assert first == second == decoded
+    assert verify.call_count == 2
+    stats = firebase.token_cache_stats()
+    assert stats.hits == 1
+    assert stats.size == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_token_async_does_not_cache_expired_claims(
+    admin_verifier: None,
+) -> None:
+    decoded = {"uid": "uid-1", "exp": time.time() - 1}
+
+    with patch(
+        "app.core.firebase.verify_firebase_token", return_value=decoded
+    ) as verify:
+        await firebase.verify_firebase_token_async("token-a")
+        await firebase.verify_firebase_token_async("token-a")
+
+    assert verify.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_token_async_uses_local_verifier_by_default() -> None:
+    server = FakeKeyServer()
+    verifier = FirebaseTokenVerifier(
+        server.project_id,
+        SigningKeyStore(FAKE_CERTS_URL, client=server.client()),
+    )
+
+    with (
+        patch("app.core.firebase.get_token_verifier", return_value=verifier),
+        patch("app.core.firebase.verify_firebase_token") as admin_verify,
+    ):
+        decoded = await firebase.verify_firebase_token_async(server.mint_token("uid-9"))
+
+    assert decoded["uid"] == "uid-9"
+    admin_verify.assert_not_called()
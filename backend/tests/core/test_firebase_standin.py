@@ -0,0 +1,90 @@
+"""End-to-end auth flows against the offline Firebase stand-in (no network)."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+from app.core import firebase
+from app.core.config import get_settings
+from app.services.firebase_login import (
+    FirebaseLoginError,
+    refresh_id_token,
+    sign_in_with_password,
+    sign_up_with_password,
+)
+
+from tests.fakes.firebase import FakeFirebase
+
+BASE_URL = "http://firebase.test"
+
+
+@pytest.fixture
+def fake_firebase(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeFirebase()
+    settings = get_settings()
+    for name, value in fake.settings_overrides(BASE_URL).items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(settings, "firebase_token_verifier", "local")
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url=BASE_URL)
+    firebase.get_token_verifier.cache_clear()
+    firebase._token_cache.cache_clear()
+    with (
+        patch("app.services.firebase_login.get_http_client", return_value=client),
+        patch("app.core.token_verifier.get_http_client", return_value=client),
+    ):
+        yield fake
+    firebase.get_token_verifier.cache_clear()
+    firebase._token_cache.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_sign_up_sign_in_and_verify(fake_firebase: FakeFirebase) -> None:
+    api_key = get_settings().firebase_api_key
+    created = await sign_up_with_password(api_key, "fan@example.com", "secret123")
+    data = await sign_in_with_password(api_key, "fan@example.com", "secret123")
+
+    decoded = await firebase.verify_firebase_token_async(data["idToken"])
+    assert decoded["uid"] == created["localId"] == data["localId"]
+    assert decoded["email"] == "fan@example.com"
+
+    # Keys are fetched once and reused for later tokens.
+    await firebase.verify_firebase_token_async(created["idToken"])
+    assert fake_firebase.calls["x509"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_refresh_token(fake_firebase: FakeFirebase) -> None:
+    api_key = get_settings().firebase_api_key
+    fake_firebase.add_account("fan@example.com", "secret123")
+    data = await sign_in_with_password(api_key, "fan@example.com", "secret123")
+
+    refreshed = await refresh_id_token(api_key, data["refreshToken"])
+    assert refreshed["localId"] == data["localId"]
+    decoded = await firebase.verify_firebase_token_async(refreshed["idToken"])
+    assert decoded["uid"] == data["localId"]
+
+    with pytest.raises(FirebaseLoginError) as exc_info:
+        await refresh_id_token(api_key, data["refreshToken"])
+    assert exc_info.value.code == "INVALID_REFRESH_TOKEN"
+
+
+@pytest.mark.asyncio
+async def test_sign_in_rejects_bad_password(fake_firebase: FakeFirebase) -> None:
+    fake_firebase.add_account("fan@example.com", "secret123")
+    with pytest.raises(FirebaseLoginError) as exc_info:
+        await sign_in_with_password(get_settings().firebase_api_key, "fan@example.com", "nope")
+    assert exc_info.value.code == "INVALID_LOGIN_CREDENTIALS"
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_serves_the_same_keys(
+    fake_firebase: FakeFirebase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "firebase_certs_url", f"{BASE_URL}/certs/jwks")
+    account = fake_firebase.add_account("fan@example.com", "secret123")
+
+    decoded = await firebase.verify_firebase_token_async(fake_firebase.mint_id_token(account))
+
+    assert decoded["uid"] == account.uid
+    assert fake_firebase.calls == {"jwks": 1}
@@ -0,0 +1,42 @@
+"""Unit tests for the shared outbound HTTP client."""
+
+import pytest
+from app.core import http_client
+from app.core.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+async def reset_client():
+    await http_client.close_http_client()
+    yield
+    await http_client.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_get_http_client_reuses_one_client() -> None:
+    first = http_client.get_http_client()
+    second = http_client.get_http_client()
+
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_close_http_client_closes_and_next_call_recreates() -> None:
+    await http_client.start_http_client()
+    client = http_client.get_http_client()
+
+    await http_client.close_http_client()
+
+    assert client.is_closed
+    assert http_client.get_http_client() is not client
+
+
+def test_build_http_client_applies_timeouts_from_settings() -> None:
+    settings = get_settings().model_copy(
+        update={"http_client_timeout_seconds": 3.0, "http_client_connect_timeout_seconds": 1.0}
+    )
+
+    client = http_client.build_http_client(settings)
+
+    assert client.timeout.read == 3.0
+    assert client.timeout.connect == 1.0
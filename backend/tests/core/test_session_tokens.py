@@ -0,0 +1,112 @@
+"""Unit tests for backend-issued session tokens."""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.core.auth import FirebaseUser, get_current_user
+from app.core.config import get_settings
+from app.core.session_tokens import (
+    SessionTokenError,
+    is_session_token,
+    mint_session_token,
+    verify_session_token,
+)
+from fastapi.security import HTTPAuthorizationCredentials
+
+from tests.fakes.securetoken import FakeKeyServer
+
+USER_ID = uuid.UUID("aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa")
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+CLAIMS = {"uid": "firebase-uid", "email": "a@b.com", "email_verified": True, "name": "A"}
+
+
+@pytest.fixture
+def session_settings(monkeypatch: pytest.MonkeyPatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "session_tokens_enabled", True)
+    monkeypatch.setattr(settings, "session_token_keys", "k2:second-secret-0123456789abcdef0123,k1:first-secret-0123456789abcdef01234")
+    monkeypatch.setattr(settings, "session_token_version", 1)
+    return settings
+
+
+def _mint() -> str:
+    token, _ = mint_session_token(
+        user_id=USER_ID, created_at=CREATED_AT, firebase_claims=CLAIMS
+    )
+    return token
+
+
+def test_round_trip_carries_internal_user_id(session_settings) -> None:
+    token = _mint()
+
+    user = FirebaseUser.from_session_token_claims(verify_session_token(token))
+
+    assert is_session_token(token)
+    assert user.uid == "firebase-uid"
+    assert user.app_user_id == USER_ID
+    assert user.app_user_created_at == CREATED_AT
+    assert user.email == "a@b.com"
+
+
+def test_tokens_signed_with_older_key_still_verify(session_settings, monkeypatch) -> None:
+    monkeypatch.setattr(session_settings, "session_token_keys", "k1:first-secret-0123456789abcdef01234")
+    token = _mint()
+    monkeypatch.setattr(
+        session_settings, "session_token_keys", "k2:second-secret-0123456789abcdef0123,k1:first-secret-0123456789abcdef01234"
+    )
+
+    assert verify_session_token(token)["app_user_id"] == str(USER_ID)
+
+
+def test_token_with_retired_key_is_rejected(session_settings, monkeypatch) -> None:
+    token = _mint()
+    monkeypatch.setattr(session_settings, "session_token_keys", "k3:third-secret-0123456789abcdef01234")
+
+    with pytest.raises(SessionTokenError, match="unknown key"):
+        verify_session_token(token)
+
+
+def test_bumping_version_revokes_tokens(session_settings, monkeypatch) -> None:
+    token = _mint()
+    monkeypatch.setattr(session_settings, "session_token_version", 2)
+
+    with pytest.raises(SessionTokenError, match="revoked"):
+        verify_session_token(token)
+
+
+def test_session_tokens_rejected_when_disabled(session_settings, monkeypatch) -> None:
+    token = _mint()
+    monkeypatch.setattr(session_settings, "session_tokens_enabled", False)
+
+    with pytest.raises(SessionTokenError, match="not enabled"):
+        verify_session_token(token)
+
+
+def test_firebase_id_tokens_are_not_session_tokens() -> None:
+    assert not is_session_token(FakeKeyServer().mint_token())
+    assert not is_session_token("not-a-jwt")
+
+
+@pytest.mark.asyncio
+async def test_firebase_custom_claim_cannot_supply_internal_user_id(session_settings) -> None:
+    claims = {**CLAIMS, "app_user_id": str(USER_ID), "app_user_created_at": CREATED_AT}
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="firebase-id-token")
+
+    with patch("app.core.auth.verify_firebase_token_async", AsyncMock(return_value=claims)):
+        user = await get_current_user(credentials)
+
+    assert user.uid == "firebase-uid"
+    assert user.app_user_id is None
+    assert user.app_user_created_at is None
+
+
+@pytest.mark.asyncio
+async def test_session_token_request_carries_internal_user_id(session_settings) -> None:
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_mint())
+
+    user = await get_current_user(credentials)
+
+    assert user.app_user_id == USER_ID
+    assert user.app_user_created_at == CREATED_AT
@@ -0,0 +1,155 @@
+"""Tests for the in-process Firebase ID token verifier (offline key server)."""
+
+import asyncio
+
+import pytest
+from app.core.token_verifier import (
+    FirebaseTokenVerifier,
+    SigningKeyStore,
+    TokenVerificationError,
+)
+
+from tests.fakes.securetoken import FAKE_CERTS_URL, FakeKeyServer
+
+
+@pytest.fixture
+def key_server() -> FakeKeyServer:
+    return FakeKeyServer()
+
+
+@pytest.fixture
+def verifier(key_server: FakeKeyServer) -> FirebaseTokenVerifier:
+    store = SigningKeyStore(FAKE_CERTS_URL, client=key_server.client())
+    return FirebaseTokenVerifier(key_server.project_id, store)
+
+
+@pytest.mark.asyncio
+async def test_verify_returns_claims_with_uid(
+    key_server: FakeKeyServer, verifier: FirebaseTokenVerifier
+) -> None:
+    token = key_server.mint_token("uid-123", email="a@b.com")
+
+    claims = await verifier.verify(token)
+
+    assert claims["uid"] == "uid-123"
+    assert claims["email"] == "a@b.com"
+
+
+@pytest.mark.asyncio
+async def test_keys_fetched_once_while_fresh(
+    key_server: FakeKeyServer, verifier: FirebaseTokenVerifier
+) -> None:
+    tokens = [key_server.mint_token(f"uid-{i}") for i in range(5)]
+
+    await asyncio.gather(*(verifier.verify(t) for t in tokens))
+
+    assert key_server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_refresh(
+    key_server: FakeKeyServer, verifier: FirebaseTokenVerifier
+) -> None:
+    verifier.key_store.min_refresh_interval = 0
+    await verifier.verify(key_server.mint_token())
+    key_server.rotate()
+
+    claims = await verifier.verify(key_server.mint_token("rotated"))
+
+    assert claims["uid"] == "rotated"
+    assert key_server.requests == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("claims", "message"),
+    [
+        ({"aud": "other-project"}, "Invalid ID token"),
+        ({"iss": "https://securetoken.google.com/other-project"}, "Invalid ID token"),
+        ({"sub": ""}, "sub"),
+    ],
+)
+async def test_verify_rejects_bad_claims(
+    key_server: FakeKeyServer,
+    verifier: FirebaseTokenVerifier,
+    claims: dict,
+    message: str,
+) -> None:
+    token = key_server.mint_token(**claims)
+
+    with pytest.raises(TokenVerificationError, match=message):
+        await verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_expired_token(
+    key_server: FakeKeyServer, verifier: FirebaseTokenVerifier
+) -> None:
+    token = key_server.mint_token(lifetime=-10)
+
+    with pytest.raises(TokenVerificationError, match="expired"):
+        await verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_token_signed_by_unknown_key(
+    verifier: FirebaseTokenVerifier,
+) -> None:
+    other = FakeKeyServer()
+
+    with pytest.raises(TokenVerificationError, match="No signing key"):
+        await verifier.verify(other.mint_token())
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_loads_keys_before_first_request(
+    key_server: FakeKeyServer,
+) -> None:
+    key_server.max_age = 0
+    store = SigningKeyStore(
+        FAKE_CERTS_URL,
+        refresh_margin=0,
+        min_refresh_interval=0.01,
+        client=key_server.client(),
+    )
+
+    store.start_background_refresh()
+    await asyncio.sleep(0.05)
+    await store.stop_background_refresh()
+
+    assert key_server.requests >= 2
+
+
+@pytest.mark.asyncio
+async def test_outage_serves_expired_keys_with_one_upstream_call(
+    key_server: FakeKeyServer,
+) -> None:
+    key_server.max_age = 0
+    store = SigningKeyStore(FAKE_CERTS_URL, client=key_server.client())
+    verifier = FirebaseTokenVerifier(key_server.project_id, store)
+    await verifier.verify(key_server.mint_token())
+    store._last_attempt = float("-inf")
+    key_server.available = False
+
+    tokens = [key_server.mint_token(f"uid-{i}") for i in range(10)]
+    results = await asyncio.gather(*(verifier.verify(t) for t in tokens))
+
+    assert [claims["uid"] for claims in results] == [f"uid-{i}" for i in range(10)]
+    assert key_server.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_outage_past_grace_rejects_without_refetching(
+    key_server: FakeKeyServer,
+) -> None:
+    store = SigningKeyStore(FAKE_CERTS_URL, stale_grace=0, client=key_server.client())
+    verifier = FirebaseTokenVerifier(key_server.project_id, store)
+    await verifier.verify(key_server.mint_token())
+    store._expires_at -= key_server.max_age  # keys just expired, no grace left
+    key_server.available = False
+
+    for _ in range(3):
+        with pytest.raises(TokenVerificationError, match="No signing key"):
+            await verifier.verify(key_server.mint_token())
+
+    assert key_server.requests == 1
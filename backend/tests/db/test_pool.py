@@ -0,0 +1,61 @@
+"""Unit tests for pool profiles and checkout metrics (no database)."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from app.core.config import POOL_PROFILES, Settings
+from app.db.pool import PoolMetrics, engine_pool_options, metered_pool_class
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+
+def _pool(metrics: PoolMetrics, **kwargs):
+    return metered_pool_class(metrics)(creator=MagicMock, **kwargs)
+
+
+def test_db_pool_applies_field_overrides_to_profile() -> None:
+    settings = Settings(db_pool_profile="large", db_pool_timeout_seconds=2.5)
+
+    profile = settings.db_pool()
+
+    assert profile.pool_size == POOL_PROFILES["large"].pool_size
+    assert profile.pool_timeout == 2.5
+
+
+def test_engine_pool_options_pass_profile_to_engine() -> None:
+    options = engine_pool_options(POOL_PROFILES["small"], PoolMetrics())
+
+    assert options["pool_size"] == POOL_PROFILES["small"].pool_size
+    assert options["pool_pre_ping"] is POOL_PROFILES["small"].pool_pre_ping
+    assert options["poolclass"].__name__ == "MeteredAsyncPool"
+
+
+@pytest.mark.asyncio
+async def test_checkouts_and_timeouts_are_recorded() -> None:
+    metrics = PoolMetrics()
+    pool = _pool(metrics, pool_size=1, max_overflow=0, timeout=0.01)
+
+    held = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+
+    stats = metrics.snapshot(pool)
+    assert stats.checkouts == 1
+    assert stats.timeouts == 1
+    assert stats.checked_out == 1
+    assert stats.wait_ms_max >= stats.wait_ms_avg > 0
+
+    await greenlet_spawn(held.close)
+    assert metrics.snapshot(pool).checked_in == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_survive_pool_recreate() -> None:
+    metrics = PoolMetrics()
+    pool = _pool(metrics, pool_size=2, max_overflow=1)
+
+    recreated = pool.recreate()
+    conn = await greenlet_spawn(recreated.connect)
+
+    assert metrics.snapshot(recreated).checkouts == 1
+    await greenlet_spawn(conn.close)
@@ -0,0 +1,67 @@
+"""save() and eager server defaults: generated columns come back without a refresh."""
+
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.db.session import save
+from app.models import Visit
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+
+def _visit() -> Visit:
+    # SQLite has no gen_random_uuid(), so the id is set client-side here.
+    return Visit(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        arena_id=uuid.uuid4(),
+        home_team_id=uuid.uuid4(),
+        away_team_id=uuid.uuid4(),
+        visit_date=date(2024, 1, 1),
+    )
+
+
+def test_insert_and_update_return_server_defaults() -> None:
+    engine = create_engine("sqlite://")
+    Visit.__table__.create(engine)
+    statements: list[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    with Session(engine, expire_on_commit=False) as session:
+        visit = _visit()
+        session.add(visit)
+        session.commit()
+        assert visit.created_at is not None
+        assert visit.updated_at is not None
+
+        visit.seating_location = "Club"
+        session.commit()
+        assert "updated_at" in visit.__dict__
+
+    assert statements[0].startswith("INSERT INTO visits")
+    assert "RETURNING created_at, updated_at" in statements[0]
+    assert statements[1].startswith("UPDATE visits")
+    assert "RETURNING updated_at" in statements[1]
+    assert not any(s.startswith("SELECT") for s in statements)
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("expire_on_commit", [False, True])
+async def test_save_refreshes_only_when_commit_expires(expire_on_commit: bool) -> None:
+    db = AsyncMock()
+    db.add = MagicMock()
+    db.sync_session = MagicMock(expire_on_commit=expire_on_commit)
+    visit = _visit()
+
+    assert await save(visit, db) is visit
+
+    db.add.assert_called_once_with(visit)
+    db.commit.assert_awaited_once()
+    assert db.refresh.await_count == int(expire_on_commit)
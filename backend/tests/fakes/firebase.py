@@ -0,0 +1,204 @@
+"""Offline Firebase Auth stand-in for tests and auth-path benchmarks.
+
+Serves the Identity Toolkit sign-in, sign-up and IdP endpoints, the Secure Token
+refresh endpoint, and x509/JWKS signing-key endpoints, minting correctly signed ID
+tokens (via :class:`tests.fakes.securetoken.FakeKeyServer`). Point the backend at it
+with ``FIREBASE_AUTH_BASE_URL``, ``FIREBASE_SECURETOKEN_BASE_URL`` and
+``FIREBASE_CERTS_URL`` (see :meth:`FakeFirebase.settings_overrides`).
+
+Run standalone for load testing:
+  cd backend
+  python -m tests.fakes.firebase --port 9099
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import secrets
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs
+
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from tests.fakes.securetoken import FakeKeyServer
+
+ID_TOKEN_LIFETIME = 3600
+
+
+@dataclass
+class FakeAccount:
+    uid: str
+    email: str
+    password: str | None = None
+    name: str | None = None
+    picture: str | None = None
+    provider: str = "password"
+
+
+@dataclass
+class FakeFirebase:
+    """In-memory Firebase Auth project: accounts, refresh tokens, signing keys."""
+
+    project_id: str = "test-project"
+    keys: FakeKeyServer = field(init=False)
+    accounts: dict[str, FakeAccount] = field(default_factory=dict)
+    refresh_tokens: dict[str, str] = field(default_factory=dict)
+    calls: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.keys = FakeKeyServer(self.project_id)
+        self.app = self._build_app()
+
+    def settings_overrides(self, base_url: str) -> dict[str, str]:
+        """Settings fields that point the backend at this stand-in served at ``base_url``."""
+        base = base_url.rstrip("/")
+        return {
+            "firebase_project_id": self.project_id,
+            "firebase_api_key": "fake-api-key",
+            "firebase_auth_base_url": f"{base}/identitytoolkit/v1",
+            "firebase_securetoken_base_url": f"{base}/securetoken/v1",
+            "firebase_certs_url": f"{base}/certs/x509",
+        }
+
+    def add_account(self, email: str, password: str, **profile: str) -> FakeAccount:
+        account = FakeAccount(uid=secrets.token_hex(14), email=email, password=password, **profile)
+        self.accounts[email] = account
+        return account
+
+    def mint_id_token(self, account: FakeAccount) -> str:
+        return self.keys.mint_token(
+            account.uid,
+            lifetime=ID_TOKEN_LIFETIME,
+            email=account.email,
+            email_verified=account.provider != "password",
+            name=account.name,
+            picture=account.picture,
+            firebase={"sign_in_provider": account.provider},
+        )
+
+    def _token_payload(self, account: FakeAccount) -> dict:
+        refresh_token = secrets.token_urlsafe(32)
+        self.refresh_tokens[refresh_token] = account.email
+        return {
+            "kind": "identitytoolkit#VerifyPasswordResponse",
+            "localId": account.uid,
+            "email": account.email,
+            "idToken": self.mint_id_token(account),
+            "refreshToken": refresh_token,
+            "expiresIn": str(ID_TOKEN_LIFETIME),
+        }
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Firebase Auth")
+
+        def error(message: str, status: int = 400) -> JSONResponse:
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"code": status, "message": message}},
+            )
+
+        @app.post("/identitytoolkit/v1/accounts:signInWithPassword")
+        async def sign_in(request: Request) -> JSONResponse:
+            self._count("signInWithPassword")
+            body = await request.json()
+            account = self.accounts.get(body.get("email", ""))
+            if account is None or account.password != body.get("password"):
+                return error("INVALID_LOGIN_CREDENTIALS")
+            return JSONResponse(self._token_payload(account))
+
+        @app.post("/identitytoolkit/v1/accounts:signUp")
+        async def sign_up(request: Request) -> JSONResponse:
+            self._count("signUp")
+            body = await request.json()
+            email, password = body.get("email", ""), body.get("password", "")
+            if email in self.accounts:
+                return error("EMAIL_EXISTS")
+            if len(password) < 6:
+                return error("WEAK_PASSWORD : Password should be at least 6 characters")
+            return JSONResponse(self._token_payload(self.add_account(email, password)))
+
+        @app.post("/identitytoolkit/v1/accounts:signInWithIdp")
+        async def sign_in_with_idp(request: Request) -> JSONResponse:
+            self._count("signInWithIdp")
+            body = await request.json()
+            post_body = parse_qs(body.get("postBody", ""))
+            google_token = (post_body.get("id_token") or [""])[0]
+            try:
+                claims = jwt.decode(google_token, options={"verify_signature": False})
+            except jwt.PyJWTError:
+                return error("INVALID_IDP_RESPONSE")
+            email = claims.get("email")
+            if not email:
+                return error("INVALID_IDP_RESPONSE")
+            account = self.accounts.get(email) or FakeAccount(
+                uid=hashlib.sha256(email.encode()).hexdigest()[:28],
+                email=email,
+                name=claims.get("name"),
+                picture=claims.get("picture"),
+                provider="google.com",
+            )
+            self.accounts[email] = account
+            return JSONResponse(self._token_payload(account))
+
+        @app.post("/securetoken/v1/token")
+        async def refresh(request: Request) -> JSONResponse:
+            self._count("token")
+            form = parse_qs((await request.body()).decode("utf-8"))
+            email = self.refresh_tokens.pop((form.get("refresh_token") or [""])[0], None)
+            if email is None:
+                return error("INVALID_REFRESH_TOKEN")
+            payload = self._token_payload(self.accounts[email])
+            return JSONResponse(
+                {
+                    "id_token": payload["idToken"],
+                    "refresh_token": payload["refreshToken"],
+                    "expires_in": payload["expiresIn"],
+                    "user_id": payload["localId"],
+                    "token_type": "Bearer",
+                }
+            )
+
+        @app.get("/certs/x509")
+        async def x509_certs() -> JSONResponse:
+            self._count("x509")
+            return JSONResponse(
+                self.keys.certs(),
+                headers={"Cache-Control": f"public, max-age={self.keys.max_age}"},
+            )
+
+        @app.get("/certs/jwks")
+        async def jwks() -> JSONResponse:
+            self._count("jwks")
+            return JSONResponse(
+                self.keys.jwks(),
+                headers={"Cache-Control": f"public, max-age={self.keys.max_age}"},
+            )
+
+        return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the offline Firebase Auth stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9099)
+    parser.add_argument("--project-id", default="test-project")
+    args = parser.parse_args()
+
+    fake = FakeFirebase(project_id=args.project_id)
+    base_url = f"http://{args.host}:{args.port}"
+    print("Point the backend at this stand-in with:")
+    for key, value in fake.settings_overrides(base_url).items():
+        print(f"  {key.upper()}={value}")
+    uvicorn.run(fake.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
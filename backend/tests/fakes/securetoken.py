@@ -0,0 +1,116 @@
+"""Offline stand-in for Google's securetoken signing-key endpoint.
+
+Generates an RSA key pair with a self-signed cert, serves it in the same
+``{kid: pem}`` shape as the real x509 endpoint (with Cache-Control), and mints
+ID tokens signed with that key.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from cryptography.x509.oid import NameOID
+
+from app.core.token_verifier import FIREBASE_ISSUER_PREFIX
+
+FAKE_CERTS_URL = "http://securetoken.test/x509"
+
+
+def _self_signed_cert(private_key: rsa.RSAPrivateKey) -> str:
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    return cert.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+
+
+class FakeKeyServer:
+    """Serves signing certs and mints tokens; counts cert downloads."""
+
+    def __init__(self, project_id: str = "test-project", *, max_age: int = 3600) -> None:
+        self.project_id = project_id
+        self.max_age = max_age
+        self.requests = 0
+        self.available = True
+        self._keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.kid = self.rotate()
+
+    def rotate(self) -> str:
+        """Add a new signing key and make it the one used to mint tokens."""
+        kid = uuid.uuid4().hex
+        self._keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._certs = {k: _self_signed_cert(key) for k, key in self._keys.items()}
+        self.kid = kid
+        return kid
+
+    def certs(self) -> dict[str, str]:
+        """Current key set in the x509 endpoint's ``{kid: pem}`` shape."""
+        return dict(self._certs)
+
+    def jwks(self) -> dict[str, list[dict]]:
+        """Current key set as a JWKS document."""
+        keys = []
+        for kid, key in self._keys.items():
+            jwk = RSAAlgorithm.to_jwk(key.public_key(), as_dict=True)
+            keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return {"keys": keys}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if not self.available:
+            return httpx.Response(503)
+        return httpx.Response(
+            200,
+            json=self.certs(),
+            headers={"Cache-Control": f"public, max-age={self.max_age}"},
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client whose requests are answered by this server."""
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+    def mint_token(
+        self,
+        uid: str = "firebase-test-uid",
+        *,
+        kid: str | None = None,
+        lifetime: int = 3600,
+        **claims: Any,
+    ) -> str:
+        """Mint an ID token shaped like Firebase's; ``claims`` override defaults."""
+        now = int(time.time())
+        payload: dict[str, Any] = {
+            "iss": f"{FIREBASE_ISSUER_PREFIX}{self.project_id}",
+            "aud": self.project_id,
+            "auth_time": now,
+            "user_id": uid,
+            "sub": uid,
+            "iat": now,
+            "exp": now + lifetime,
+            "firebase": {"sign_in_provider": "password"},
+        }
+        payload.update(claims)
+        signing_kid = kid or self.kid
+        return jwt.encode(
+            payload,
+            self._keys[signing_kid],
+            algorithm="RS256",
+            headers={"kid": signing_kid},
+        )
@@ -3,19 +3,23 @@
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.core.auth import FirebaseUser
+from app.core.auth import FirebaseUser, get_current_user
+from app.core.config import get_settings
+from app.core.session_tokens import verify_session_token
 from app.core.error_handlers import (
     api_exception_handler,
     integrity_error_handler,
     request_validation_handler,
 )
 from app.core.exceptions import APIException
+from app.db.session import get_db
 from app.routers import auth as auth_router
 from app.services.firebase_login import FirebaseLoginError
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 @pytest.fixture
@@ -28,6 +32,13 @@ def auth_test_app() -> FastAPI:
     return app
 
 
+@pytest.fixture
+def session_tokens_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "session_tokens_enabled", True)
+    monkeypatch.setattr(settings, "session_token_keys", "k1:test-secret-0123456789abcdef0123456789")
+
+
 @pytest.fixture
 async def auth_client(auth_test_app: FastAPI) -> AsyncClient:
     transport = ASGITransport(app=auth_test_app)
@@ -56,7 +67,11 @@ async def test_register_success(auth_client: AsyncClient, test_db_user) -> None:
             new_callable=AsyncMock,
             return_value=firebase_data,
         ),
-        patch("app.routers.auth.verify_firebase_token", return_value=decoded),
+        patch(
+            "app.routers.auth.verify_firebase_token_async",
+            new_callable=AsyncMock,
+            return_value=decoded,
+        ),
         patch(
             "app.routers.auth.get_or_create_user",
             new_callable=AsyncMock,
@@ -136,7 +151,11 @@ async def test_google_sign_in_success(auth_client: AsyncClient, test_db_user) ->
             new_callable=AsyncMock,
             return_value=firebase_data,
         ),
-        patch("app.routers.auth.verify_firebase_token", return_value=decoded),
+        patch(
+            "app.routers.auth.verify_firebase_token_async",
+            new_callable=AsyncMock,
+            return_value=decoded,
+        ),
         patch(
             "app.routers.auth.get_or_create_user",
             new_callable=AsyncMock,
@@ -175,3 +194,117 @@ async def test_google_sign_in_invalid_token(auth_client: AsyncClient) -> None:
         )
 
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_includes_session_token_when_enabled(
+    auth_client: AsyncClient, auth_test_app: FastAPI, test_db_user, session_tokens_enabled
+) -> None:
+    async def fake_db():
+        yield AsyncMock(spec=AsyncSession)
+
+    auth_test_app.dependency_overrides[get_db] = fake_db
+    firebase_data = {"idToken": "id-token", "refreshToken": "refresh", "expiresIn": "3600"}
+    decoded = {"uid": test_db_user.firebase_uid, "email": test_db_user.email}
+
+    with (
+        patch(
+            "app.routers.auth.sign_in_with_password",
+            new_callable=AsyncMock,
+            return_value=firebase_data,
+        ),
+        patch(
+            "app.routers.auth.verify_firebase_token_async",
+            new_callable=AsyncMock,
+            return_value=decoded,
+        ),
+        patch(
+            "app.routers.auth.get_or_create_user",
+            new_callable=AsyncMock,
+            return_value=test_db_user,
+        ),
+    ):
+        response = await auth_client.post(
+            "/api/v1/auth/login",
+            json={"email": test_db_user.email, "password": "secret12"},
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    claims = verify_session_token(body["session_token"])
+    assert claims["app_user_id"] == str(test_db_user.id)
+    assert body["session_expires_in"] == get_settings().session_token_ttl_seconds
+
+
+@pytest.mark.asyncio
+async def test_create_session_exchanges_firebase_token(
+    auth_client: AsyncClient,
+    auth_test_app: FastAPI,
+    test_firebase_user,
+    test_db_user,
+    session_tokens_enabled,
+) -> None:
+    async def fake_db():
+        yield AsyncMock(spec=AsyncSession)
+
+    auth_test_app.dependency_overrides[get_current_user] = lambda: test_firebase_user
+    auth_test_app.dependency_overrides[get_db] = fake_db
+
+    with patch(
+        "app.routers.auth.get_or_create_user",
+        new_callable=AsyncMock,
+        return_value=test_db_user,
+    ):
+        response = await auth_client.post("/api/v1/auth/session")
+
+    assert response.status_code == 200
+    claims = verify_session_token(response.json()["session_token"])
+    assert claims["uid"] == test_firebase_user.uid
+    assert claims["app_user_id"] == str(test_db_user.id)
+
+
+@pytest.mark.asyncio
+async def test_create_session_not_available_when_disabled(
+    auth_client: AsyncClient, auth_test_app: FastAPI, test_firebase_user
+) -> None:
+    auth_test_app.dependency_overrides[get_current_user] = lambda: test_firebase_user
+
+    response = await auth_client.post("/api/v1/auth/session")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_refresh_returns_login_response(auth_client: AsyncClient) -> None:
+    refreshed = {"idToken": "fresh-id", "refreshToken": "rotated", "expiresIn": "3600"}
+
+    with patch(
+        "app.routers.auth.refresh_id_token",
+        new_callable=AsyncMock,
+        return_value=refreshed,
+    ) as m_refresh:
+        response = await auth_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": "old-refresh"}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id_token": "fresh-id",
+        "refresh_token": "rotated",
+        "expires_in": 3600,
+    }
+    assert m_refresh.await_args.kwargs["refresh_token"] == "old-refresh"
+
+
+@pytest.mark.asyncio
+async def test_refresh_with_expired_token_returns_401(auth_client: AsyncClient) -> None:
+    with patch(
+        "app.routers.auth.refresh_id_token",
+        new_callable=AsyncMock,
+        side_effect=FirebaseLoginError("TOKEN_EXPIRED", code="TOKEN_EXPIRED"),
+    ):
+        response = await auth_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": "expired"}
+        )
+
+    assert response.status_code == 401
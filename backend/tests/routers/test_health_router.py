@@ -0,0 +1,25 @@
+"""Tests for health router endpoints."""
+
+import pytest
+from app.routers import health as health_router
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+
+@pytest.fixture
+async def health_client() -> AsyncClient:
+    app = FastAPI()
+    app.include_router(health_router.router)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_pool_health_reports_profile_and_counters(health_client: AsyncClient) -> None:
+    response = await health_client.get("/health/pool")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["profile"] == "dev"
+    assert body["pool_size"] == 5
+    assert {"checked_out", "overflow", "timeouts", "wait_ms_p95"} <= body.keys()
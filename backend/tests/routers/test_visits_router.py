@@ -23,7 +23,7 @@ def visits_client(visits_test_app, test_firebase_user, test_db_user):
     visits_test_app.dependency_overrides[get_current_user] = lambda: test_firebase_user
     visits_test_app.dependency_overrides[get_db] = fake_db
 
-    with patch("app.routers.visits.get_or_create_user", new_callable=AsyncMock) as m_user:
+    with patch("app.routers.visits.resolve_user", new_callable=AsyncMock) as m_user:
         m_user.return_value = test_db_user
         with TestClient(visits_test_app) as client:
             yield client
@@ -67,7 +67,7 @@ def test_get_latest_visit_returns_null_when_empty(visits_client: TestClient) ->
 def test_get_visits_returns_list_and_total_header(visits_client: TestClient) -> None:
     vr = sample_visit_response()
     with patch("app.routers.visits.get_users_visits", new_callable=AsyncMock) as m:
-        m.return_value = ([vr], 42)
+        m.return_value = ([vr], 42, None)
         with patch(
             "app.routers.visits.enrich_visits_with_game_scores",
             new_callable=AsyncMock,
@@ -77,11 +77,49 @@ def test_get_visits_returns_list_and_total_header(visits_client: TestClient) ->
 
     assert r.status_code == 200
     assert r.headers.get("X-Total-Count") == "42"
+    assert "X-Next-Cursor" not in r.headers
     data = r.json()
     assert len(data) == 1
     assert data[0]["id"] == str(vr.id)
 
 
+def test_get_visits_passes_cursor_and_returns_next_cursor(visits_client: TestClient) -> None:
+    vr = sample_visit_response()
+    with patch("app.routers.visits.get_users_visits", new_callable=AsyncMock) as m:
+        m.return_value = ([vr], 42, "next-page")
+        with patch(
+            "app.routers.visits.enrich_visits_with_game_scores",
+            new_callable=AsyncMock,
+            return_value=[vr],
+        ):
+            r = visits_client.get("/api/v1/visits", params={"cursor": "this-page", "limit": 1})
+
+    assert r.status_code == 200
+    assert r.headers.get("X-Next-Cursor") == "next-page"
+    assert m.await_args.args[2:] == (0, 1, "this-page")
+
+
+def test_get_visits_omits_total_header_when_opted_out(visits_client: TestClient) -> None:
+    with patch("app.routers.visits.get_users_visits", new_callable=AsyncMock) as m:
+        m.return_value = ([], None, None)
+        with patch(
+            "app.routers.visits.enrich_visits_with_game_scores",
+            new_callable=AsyncMock,
+            return_value=[],
+        ):
+            r = visits_client.get("/api/v1/visits", params={"include_total": "false"})
+
+    assert r.status_code == 200
+    assert "X-Total-Count" not in r.headers
+    assert m.await_args.kwargs["include_total"] is False
+
+
+def test_get_visits_rejects_cursor_with_skip(visits_client: TestClient) -> None:
+    r = visits_client.get("/api/v1/visits", params={"cursor": "abc", "skip": 20})
+
+    assert r.status_code == 422
+
+
 def test_get_visit_returns_single(visits_client: TestClient) -> None:
     vr = sample_visit_response()
     with patch("app.routers.visits.get_visit_by_id_for_user", new_callable=AsyncMock) as m:
@@ -0,0 +1,88 @@
+"""Unit tests for Firebase Identity Toolkit REST calls (mock transport)."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from app.services.firebase_login import (
+    FirebaseLoginError,
+    refresh_id_token,
+    sign_in_with_password,
+)
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_sign_in_uses_shared_client_for_every_call() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"idToken": "t", "refreshToken": "r", "expiresIn": "3600"})
+
+    client = _client(handler)
+    with patch("app.services.firebase_login.get_http_client", return_value=client):
+        await sign_in_with_password("key", "a@b.com", "pw")
+        data = await sign_in_with_password("key", "a@b.com", "pw")
+
+    assert data["idToken"] == "t"
+    assert len(requests) == 2
+    assert not client.is_closed
+    assert requests[0].url.params["key"] == "key"
+
+
+@pytest.mark.asyncio
+async def test_sign_in_error_maps_firebase_code() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"error": {"message": "INVALID_PASSWORD"}})
+
+    with patch("app.services.firebase_login.get_http_client", return_value=_client(handler)):
+        with pytest.raises(FirebaseLoginError) as exc_info:
+            await sign_in_with_password("key", "a@b.com", "bad")
+
+    assert exc_info.value.code == "INVALID_PASSWORD"
+
+
+@pytest.mark.asyncio
+async def test_refresh_id_token_coalesces_concurrent_refreshes() -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        assert b"grant_type=refresh_token" in request.content
+        return httpx.Response(
+            200,
+            json={
+                "id_token": "new-id",
+                "refresh_token": "new-refresh",
+                "expires_in": "3600",
+                "user_id": "uid",
+            },
+        )
+
+    with patch("app.services.firebase_login.get_http_client", return_value=_client(handler)):
+        results = await asyncio.gather(
+            *(refresh_id_token("key", "same-refresh-token") for _ in range(4))
+        )
+
+    assert calls == 1
+    assert all(r["idToken"] == "new-id" for r in results)
+    assert results[0]["refreshToken"] == "new-refresh"
+
+
+@pytest.mark.asyncio
+async def test_refresh_id_token_error_maps_firebase_code() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"error": {"message": "TOKEN_EXPIRED"}})
+
+    with patch("app.services.firebase_login.get_http_client", return_value=_client(handler)):
+        with pytest.raises(FirebaseLoginError) as exc_info:
+            await refresh_id_token("key", "stale")
+
+    assert exc_info.value.code == "TOKEN_EXPIRED"
@@ -0,0 +1,132 @@
+"""Unit tests for the deferred profile sync writer (mocked sessions)."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.profile_sync import ProfileSyncWriter
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+
+def _session_factory(db: AsyncMock) -> MagicMock:
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesces_per_uid_into_one_batched_update() -> None:
+    db = AsyncMock()
+    writer = ProfileSyncWriter(_session_factory(db))
+
+    writer.enqueue("uid-1", {"display_name": "A"})
+    writer.enqueue("uid-1", {"display_name": "B", "photo_url": "https://p"})
+    writer.enqueue("uid-2", {"email": "new@example.com"})
+
+    assert await writer.flush() == 2
+    assert writer.pending == 0
+    db.execute.assert_awaited_once()
+    stmt, params = db.execute.await_args.args
+    assert params == [
+        {
+            "p_firebase_uid": "uid-1",
+            "p_email": None,
+            "p_display_name": "B",
+            "p_photo_url": "https://p",
+        },
+        {
+            "p_firebase_uid": "uid-2",
+            "p_email": "new@example.com",
+            "p_display_name": None,
+            "p_photo_url": None,
+        },
+    ]
+    sql = str(stmt.compile(dialect=postgresql.psycopg.dialect()))
+    assert sql.startswith("UPDATE users SET")
+    assert "coalesce" in sql
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_flush_with_nothing_pending_opens_no_session() -> None:
+    factory = _session_factory(AsyncMock())
+    writer = ProfileSyncWriter(factory)
+
+    assert await writer.flush() == 0
+    factory.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_changes_for_the_next_interval() -> None:
+    db = AsyncMock()
+    db.execute.side_effect = RuntimeError("db down")
+    writer = ProfileSyncWriter(_session_factory(db))
+    writer.enqueue("uid-1", {"display_name": "Old", "photo_url": "https://p"})
+
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    writer.enqueue("uid-1", {"display_name": "New"})
+
+    assert writer._pending == {"uid-1": {"display_name": "New", "photo_url": "https://p"}}
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_changes() -> None:
+    db = AsyncMock()
+    writer = ProfileSyncWriter(_session_factory(db), interval_seconds=60)
+    writer.start()
+    writer.enqueue("uid-1", {"display_name": "A"})
+
+    await writer.stop()
+
+    db.execute.assert_awaited_once()
+    assert writer.pending == 0
+
+
+def _rejecting_session(bad_uid: str) -> AsyncMock:
+    """Session whose UPDATE fails (unique email) whenever ``bad_uid`` is in the batch."""
+
+    async def execute(stmt, params):
+        if any(p["p_firebase_uid"] == bad_uid for p in params):
+            raise IntegrityError("UPDATE users", params, Exception("ix_users_email"))
+
+    savepoint = MagicMock()
+    savepoint.__aenter__ = AsyncMock()
+    savepoint.__aexit__ = AsyncMock(return_value=False)
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=execute)
+    db.begin_nested = MagicMock(return_value=savepoint)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_does_not_block_the_others() -> None:
+    db = _rejecting_session("uid-bad")
+    writer = ProfileSyncWriter(_session_factory(db))
+    writer.enqueue("uid-good", {"display_name": "Good"})
+    writer.enqueue("uid-bad", {"email": "taken@example.com"})
+
+    assert await writer.flush() == 1
+
+    assert writer._pending == {"uid-bad": {"email": "taken@example.com"}}
+    written = [call.args[1] for call in db.execute.await_args_list[1:]]
+    assert [params[0]["p_firebase_uid"] for params in written] == ["uid-good", "uid-bad"]
+    db.rollback.assert_awaited_once()
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_repeatedly_rejected_row_is_dropped() -> None:
+    dropped = []
+    writer = ProfileSyncWriter(
+        _session_factory(_rejecting_session("uid-bad")), on_dropped=dropped.append
+    )
+    writer.enqueue("uid-bad", {"email": "taken@example.com"})
+
+    for _ in range(3):
+        assert await writer.flush() == 0
+
+    assert writer.pending == 0
+    assert dropped == ["uid-bad"]
+    assert writer._attempts == {}
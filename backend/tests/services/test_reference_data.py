@@ -0,0 +1,110 @@
+"""Unit tests for the in-process team/arena reference snapshot."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.models import Arena, Team
+from app.services.reference_data import ReferenceData
+
+from tests.conftest import build_arena, build_team
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _db(teams: list[Team], arenas: list[Arena]) -> AsyncMock:
+    """Session whose SELECTs return the current contents of ``teams`` / ``arenas``."""
+
+    async def execute(stmt):
+        entity = stmt.column_descriptions[0]["entity"]
+        result = MagicMock()
+        result.scalars.return_value = list(teams if entity is Team else arenas)
+        return result
+
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=execute)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_reused_until_ttl() -> None:
+    team, arena = build_team(uuid.uuid4()), build_arena(uuid.uuid4())
+    db = _db([team], [arena])
+    clock = Clock()
+    reference = ReferenceData(60, clock=clock)
+
+    first = await reference.for_ids(db, team_ids=[team.id], arena_ids=[arena.id])
+    clock.now = 59
+    second = await reference.for_ids(db, team_ids=[team.id], arena_ids=[arena.id])
+
+    assert first is second
+    assert first.teams[team.id].name == team.name
+    assert first.arenas[arena.id].name == arena.name
+    assert db.execute.await_count == 2
+
+    clock.now = 60
+    third = await reference.current(db)
+    assert db.execute.await_count == 4
+    assert third is first  # unchanged content keeps the same snapshot and version
+
+
+@pytest.mark.asyncio
+async def test_unknown_id_triggers_reload_and_bumps_version() -> None:
+    team, arena = build_team(uuid.uuid4(), "Old", "OLD"), build_arena(uuid.uuid4())
+    teams = [team]
+    db = _db(teams, [arena])
+    reference = ReferenceData(3600, clock=Clock())
+    first = await reference.current(db)
+
+    new_team = build_team(uuid.uuid4(), "New", "NEW")
+    teams.append(new_team)
+    snapshot = await reference.for_ids(db, team_ids=[team.id, new_team.id])
+
+    assert snapshot.version == first.version + 1
+    assert snapshot.teams[new_team.id].abbreviation == "NEW"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reloads_share_one_load() -> None:
+    db = _db([build_team(uuid.uuid4())], [build_arena(uuid.uuid4())])
+    reference = ReferenceData(60, clock=Clock())
+
+    snapshots = await asyncio.gather(*(reference.current(db) for _ in range(5)))
+
+    assert all(s is snapshots[0] for s in snapshots)
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_no_ids_needs_no_load() -> None:
+    db = _db([], [])
+    reference = ReferenceData(60, clock=Clock())
+
+    snapshot = await reference.for_ids(db)
+
+    assert snapshot.version == 0
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_id_reload_is_rate_limited() -> None:
+    db = _db([build_team(uuid.uuid4())], [build_arena(uuid.uuid4())])
+    clock = Clock()
+    reference = ReferenceData(3600, clock=clock)
+    await reference.current(db)
+    bogus = uuid.uuid4()
+
+    await reference.for_ids(db, team_ids=[bogus], miss_reload_min_age=1.0)
+    assert db.execute.await_count == 2
+
+    clock.now = 1.0
+    snapshot = await reference.for_ids(db, team_ids=[bogus], miss_reload_min_age=1.0)
+    assert db.execute.await_count == 4
+    assert bogus not in snapshot.teams
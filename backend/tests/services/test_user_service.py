@@ -0,0 +1,273 @@
+"""Unit tests for user provisioning (mocked AsyncSession)."""
+
+import asyncio
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.auth import FirebaseUser
+from app.core.config import get_settings
+from app.models import User
+from app.services import user_service
+from app.services.profile_sync import ProfileSyncWriter, get_profile_sync_writer
+from app.services.user_service import (
+    UserIdentity,
+    get_or_create_user,
+    resolve_user,
+    upsert_user,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.fixture(autouse=True)
+def clear_identity_cache():
+    user_service._identity_cache.cache_clear()
+    yield
+    user_service._identity_cache.cache_clear()
+
+
+@pytest.fixture
+def inline_profile_sync(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "profile_sync_deferred", False)
+
+
+@pytest.fixture
+def sync_writer(monkeypatch: pytest.MonkeyPatch) -> ProfileSyncWriter:
+    writer = ProfileSyncWriter(MagicMock())
+    monkeypatch.setattr(user_service, "get_profile_sync_writer", lambda: writer)
+    return writer
+
+
+def _result(user: User | None) -> MagicMock:
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+    result.scalar_one.return_value = user
+    return result
+
+
+def _db_returning(*users: User | None) -> AsyncMock:
+    db = AsyncMock(spec=AsyncSession)
+    db.execute = AsyncMock(side_effect=[_result(u) for u in users])
+    return db
+
+
+@pytest.mark.asyncio
+async def test_existing_user_with_unchanged_profile_skips_write(test_db_user: User) -> None:
+    db = _db_returning(test_db_user)
+    firebase_user = FirebaseUser(
+        {"uid": test_db_user.firebase_uid, "email": test_db_user.email}
+    )
+
+    user = await get_or_create_user(db, firebase_user)
+
+    assert user is test_db_user
+    db.commit.assert_not_awaited()
+    db.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_existing_user_with_changed_claims_is_upserted(test_db_user: User) -> None:
+    updated = User(
+        id=test_db_user.id,
+        firebase_uid=test_db_user.firebase_uid,
+        email=test_db_user.email,
+        display_name="New Name",
+    )
+    db = _db_returning(test_db_user, updated)
+    firebase_user = FirebaseUser(
+        {
+            "uid": test_db_user.firebase_uid,
+            "email": test_db_user.email,
+            "name": "New Name",
+        }
+    )
+
+    user = await get_or_create_user(db, firebase_user)
+
+    assert user is updated
+    assert db.execute.await_count == 2
+    db.commit.assert_awaited_once()
+    db.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_created_with_upsert(
+    test_firebase_user: FirebaseUser, test_db_user: User
+) -> None:
+    db = _db_returning(None, test_db_user)
+
+    user = await get_or_create_user(db, test_firebase_user)
+
+    assert user is test_db_user
+    db.add.assert_not_called()
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_upsert_user_is_one_conflict_safe_statement(
+    test_firebase_user: FirebaseUser, test_db_user: User
+) -> None:
+    db = _db_returning(test_db_user)
+
+    user = await upsert_user(db, test_firebase_user)
+
+    assert user is test_db_user
+    sql = str(
+        db.execute.await_args.args[0].compile(dialect=postgresql.psycopg.dialect())
+    )
+    assert "ON CONFLICT (firebase_uid) DO UPDATE" in sql
+    assert "RETURNING" in sql
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_upsert_user_rereads_row_when_statement_returns_nothing(
+    test_firebase_user: FirebaseUser, test_db_user: User
+) -> None:
+    db = _db_returning(None, test_db_user)
+
+    user = await upsert_user(db, test_firebase_user)
+
+    assert user is test_db_user
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_serves_repeat_requests_from_cache(test_db_user: User) -> None:
+    firebase_user = FirebaseUser(
+        {"uid": test_db_user.firebase_uid, "email": test_db_user.email}
+    )
+    with patch(
+        "app.services.user_service.get_or_create_user",
+        new_callable=AsyncMock,
+        return_value=test_db_user,
+    ) as m_get:
+        first = await resolve_user(AsyncMock(), firebase_user)
+        second = await resolve_user(AsyncMock(), firebase_user)
+
+    assert first == second == UserIdentity.from_user(test_db_user)
+    m_get.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_refreshes_when_profile_claims_change(
+    test_db_user: User, inline_profile_sync: None
+) -> None:
+    renamed = User(
+        id=test_db_user.id,
+        firebase_uid=test_db_user.firebase_uid,
+        email=test_db_user.email,
+        display_name="Renamed",
+        photo_url=None,
+        created_at=test_db_user.created_at,
+    )
+    with patch(
+        "app.services.user_service.get_or_create_user",
+        new_callable=AsyncMock,
+        side_effect=[test_db_user, renamed],
+    ) as m_get:
+        await resolve_user(
+            AsyncMock(),
+            FirebaseUser({"uid": test_db_user.firebase_uid, "email": test_db_user.email}),
+        )
+        identity = await resolve_user(
+            AsyncMock(),
+            FirebaseUser({"uid": test_db_user.firebase_uid, "name": "Renamed"}),
+        )
+
+    assert identity.display_name == "Renamed"
+    assert m_get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_coalesces_concurrent_first_requests(
+    test_db_user: User,
+) -> None:
+    firebase_user = FirebaseUser(
+        {"uid": test_db_user.firebase_uid, "email": test_db_user.email}
+    )
+
+    async def slow_get_or_create(db, fb_user, **kwargs) -> User:
+        await asyncio.sleep(0.01)
+        return test_db_user
+
+    with patch(
+        "app.services.user_service.get_or_create_user",
+        side_effect=slow_get_or_create,
+    ) as m_get:
+        identities = await asyncio.gather(
+            *(resolve_user(AsyncMock(), firebase_user) for _ in range(3))
+        )
+
+    assert len(set(identities)) == 1
+    assert m_get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_existing_user_is_not_written_when_sync_profile_is_off(
+    test_db_user: User,
+) -> None:
+    db = _db_returning(test_db_user)
+    firebase_user = FirebaseUser({"uid": test_db_user.firebase_uid, "name": "New Name"})
+
+    user = await get_or_create_user(db, firebase_user, sync_profile=False)
+
+    assert user is test_db_user
+    assert db.execute.await_count == 1
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_queues_changed_claims_instead_of_writing(
+    test_db_user: User, sync_writer: ProfileSyncWriter
+) -> None:
+    with patch(
+        "app.services.user_service.get_or_create_user",
+        new_callable=AsyncMock,
+        return_value=test_db_user,
+    ) as m_get:
+        await resolve_user(
+            AsyncMock(),
+            FirebaseUser({"uid": test_db_user.firebase_uid, "email": test_db_user.email}),
+        )
+        for name in ("Renamed", "Renamed Again"):
+            identity = await resolve_user(
+                AsyncMock(),
+                FirebaseUser({"uid": test_db_user.firebase_uid, "name": name}),
+            )
+
+    assert identity.display_name == "Renamed Again"
+    m_get.assert_awaited_once_with(ANY, ANY, sync_profile=False)
+    assert sync_writer._pending == {
+        test_db_user.firebase_uid: {"display_name": "Renamed Again"}
+    }
+
+
+@pytest.mark.asyncio
+async def test_dropped_profile_sync_invalidates_cached_identity(
+    test_db_user: User, sync_writer: ProfileSyncWriter
+) -> None:
+    sync_writer.on_dropped = user_service.invalidate_user_identity
+    with patch(
+        "app.services.user_service.get_or_create_user",
+        new_callable=AsyncMock,
+        return_value=test_db_user,
+    ) as m_get:
+        renamed = FirebaseUser({"uid": test_db_user.firebase_uid, "name": "Renamed"})
+        await resolve_user(AsyncMock(), renamed)
+        # The queued rename is rejected for good; the cache must not keep showing it.
+        for _ in range(3):
+            sync_writer._reject(
+                test_db_user.firebase_uid, {"display_name": "Renamed"}, Exception()
+            )
+        await resolve_user(AsyncMock(), FirebaseUser({"uid": test_db_user.firebase_uid}))
+
+    assert m_get.await_count == 2
+
+
+def test_profile_sync_writer_reports_drops_to_identity_cache() -> None:
+    get_profile_sync_writer.cache_clear()
+    try:
+        assert get_profile_sync_writer().on_dropped is user_service.invalidate_user_identity
+    finally:
+        get_profile_sync_writer.cache_clear()
@@ -1,40 +1,128 @@
-"""Unit tests for visit stats aggregation."""
+"""Unit tests for visit stats lookup and incremental maintenance."""
 
 import uuid
-from datetime import date, datetime, timezone
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from app.models.user import User
 from app.schemas.stats import VisitStatsResponse
+from app.services.visit_stats import VisitKeys, apply_visit_stats_delta
 from app.services.visits import get_user_visit_stats
+from sqlalchemy.dialects import postgresql
 
 
-@pytest.mark.asyncio
-async def test_get_user_visit_stats_queries_counts() -> None:
-    user = User(
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.psycopg.dialect()))
+
+
+def _user() -> User:
+    return User(
         id=uuid.uuid4(),
         firebase_uid="uid",
         email="a@b.com",
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
     )
-    db = AsyncMock()
 
-    total_result = MagicMock()
-    total_result.scalar_one.return_value = 31
-    teams_result = MagicMock()
-    teams_result.scalar_one.return_value = 12
-    arenas_result = MagicMock()
-    arenas_result.scalar_one.return_value = 8
 
-    db.execute = AsyncMock(side_effect=[total_result, teams_result, arenas_result])
+def _returning(*rows) -> MagicMock:
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_get_user_visit_stats_reads_stats_row() -> None:
+    user = _user()
+    db = AsyncMock()
+    result = MagicMock()
+    result.one_or_none.return_value = MagicMock(total_visits=31, teams_seen=12, arenas_visited=8)
+    db.execute = AsyncMock(return_value=result)
 
     stats = await get_user_visit_stats(user, db)
 
-    assert stats == VisitStatsResponse(
-        total_visits=31,
-        teams_seen=12,
-        arenas_visited=8,
+    assert stats == VisitStatsResponse(total_visits=31, teams_seen=12, arenas_visited=8)
+    db.execute.assert_awaited_once()
+    sql = _sql(db.execute.await_args.args[0])
+    assert "FROM user_visit_stats" in sql
+    assert "visits." not in sql
+
+
+@pytest.mark.asyncio
+async def test_get_user_visit_stats_without_row_is_zero() -> None:
+    db = AsyncMock()
+    result = MagicMock()
+    result.one_or_none.return_value = None
+    db.execute = AsyncMock(return_value=result)
+
+    stats = await get_user_visit_stats(_user(), db)
+
+    assert stats == VisitStatsResponse(total_visits=0, teams_seen=0, arenas_visited=0)
+
+
+@pytest.mark.asyncio
+async def test_first_visit_counts_new_teams_and_arena() -> None:
+    user_id, home, away, arena = (uuid.uuid4() for _ in range(4))
+    db = AsyncMock()
+    db.execute = AsyncMock(
+        side_effect=[_returning((home, 1), (away, 1)), _returning((arena, 1)), MagicMock()]
     )
-    assert db.execute.await_count == 3
+
+    await apply_visit_stats_delta(db, user_id, added=[VisitKeys(arena, home, away)])
+
+    team_upsert, arena_upsert, stats_upsert = (c.args[0] for c in db.execute.await_args_list)
+    assert "ON CONFLICT (user_id, team_id) DO UPDATE" in _sql(team_upsert)
+    assert "ON CONFLICT (user_id, arena_id) DO UPDATE" in _sql(arena_upsert)
+    params = stats_upsert.compile().params
+    assert (params["total_visits"], params["teams_seen"], params["arenas_visited"]) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_repeat_visit_only_bumps_total() -> None:
+    user_id, home, away, arena = (uuid.uuid4() for _ in range(4))
+    db = AsyncMock()
+    db.execute = AsyncMock(
+        side_effect=[_returning((home, 3), (away, 2)), _returning((arena, 4)), MagicMock()]
+    )
+
+    await apply_visit_stats_delta(db, user_id, added=[VisitKeys(arena, home, away)])
+
+    params = db.execute.await_args_list[-1].args[0].compile().params
+    assert (params["total_visits"], params["teams_seen"], params["arenas_visited"]) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_removing_last_visit_for_a_team_deletes_its_row() -> None:
+    user_id, home, away, arena = (uuid.uuid4() for _ in range(4))
+    db = AsyncMock()
+    db.execute = AsyncMock(
+        side_effect=[
+            _returning((home, 0), (away, 5)),
+            MagicMock(),  # delete emptied team rows
+            _returning((arena, 2)),
+            MagicMock(),
+        ]
+    )
+
+    await apply_visit_stats_delta(db, user_id, removed=[VisitKeys(arena, home, away)])
+
+    statements = [c.args[0] for c in db.execute.await_args_list]
+    assert _sql(statements[1]).startswith("DELETE FROM user_team_visit_counts")
+    params = statements[-1].compile().params
+    assert (params["total_visits"], params["teams_seen"], params["arenas_visited"]) == (-1, -1, 0)
+
+
+@pytest.mark.asyncio
+async def test_swapping_home_and_away_writes_nothing() -> None:
+    home, away, arena = (uuid.uuid4() for _ in range(3))
+    db = AsyncMock()
+
+    await apply_visit_stats_delta(
+        db,
+        uuid.uuid4(),
+        added=[VisitKeys(arena, away, home)],
+        removed=[VisitKeys(arena, home, away)],
+    )
+
+    db.execute.assert_not_awaited()
@@ -2,13 +2,18 @@
 
 import uuid
 from datetime import date, datetime, timezone
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from app.core.exceptions import ResourceNotFoundError, VisitNotFoundError
+from app.core.exceptions import (ResourceNotFoundError, ValidationError,
+                                 VisitNotFoundError)
 from app.models import Arena, Team, User, Visit
 from app.schemas.visit import VisitCreate, VisitUpdate
+from app.schemas import ArenaResponse, TeamResponse
 from app.services import visits as visits_service
+from app.services.reference_data import ReferenceSnapshot
+from app.services.visit_stats import VisitKeys
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from tests.conftest import build_arena, build_team, build_visit_with_relations
@@ -28,6 +33,49 @@ def user(test_user_id: uuid.UUID) -> User:
     )
 
 
+@pytest.fixture(autouse=True)
+def reference() -> list[Team | Arena]:
+    """
+    Teams/arenas the fake reference snapshot knows besides those attached to the
+    visits being rendered. Append to it for ids a test introduces.
+    """
+    known: list[Team | Arena] = []
+
+    def snapshot(items: list[Team | Arena]) -> ReferenceSnapshot:
+        teams, arenas = {}, {}
+        for item in items + known:
+            if isinstance(item, Team):
+                teams[item.id] = TeamResponse.model_validate(item)
+            else:
+                arenas[item.id] = ArenaResponse.model_validate(item)
+        return ReferenceSnapshot(version=1, teams=teams, arenas=arenas)
+
+    async def fake_reference_for_visits(db, visits) -> ReferenceSnapshot:
+        return snapshot([
+            related
+            for v in visits
+            for related in (vars(v).get("home_team"), vars(v).get("away_team"),
+                            vars(v).get("arena"))
+            if related is not None
+        ])
+
+    async def fake_reference_for_ids(db, **kwargs) -> ReferenceSnapshot:
+        return snapshot([])
+
+    with (
+        patch("app.services.visits.reference_for_visits", fake_reference_for_visits),
+        patch("app.services.visits.reference_for_ids", fake_reference_for_ids),
+    ):
+        yield known
+
+
+def _row(visit: Visit, **extra) -> SimpleNamespace:
+    """A column-projection row for ``visit`` (plus its attached relations for the fake reference)."""
+    columns = {c.key: getattr(visit, c.key) for c in visits_service._VISIT_COLUMNS}
+    relations = {k: visit.__dict__[k] for k in ("home_team", "away_team", "arena") if k in visit.__dict__}
+    return SimpleNamespace(**columns, **relations, **extra)
+
+
 @pytest.mark.asyncio
 async def test_get_users_visits_returns_responses_and_total(user: User) -> None:
     db = AsyncMock(spec=AsyncSession)
@@ -42,18 +90,97 @@ async def test_get_users_visits_returns_responses_and_total(user: User) -> None:
         arena=arena,
     )
 
-    count_result = MagicMock()
-    count_result.scalar_one.return_value = 7
     list_result = MagicMock()
-    list_result.scalars.return_value.all.return_value = [visit]
-    db.execute = AsyncMock(side_effect=[count_result, list_result])
+    list_result.all.return_value = [_row(visit, total=7)]
+    db.execute = AsyncMock(return_value=list_result)
 
-    responses, total = await visits_service.get_users_visits(user, db, skip=0, limit=20)
+    responses, total, next_cursor = await visits_service.get_users_visits(
+        user, db, skip=0, limit=20
+    )
 
     assert total == 7
+    db.execute.assert_awaited_once()
+    assert "SELECT count(*) AS count_1" in str(db.execute.await_args.args[0])
     assert len(responses) == 1
     assert responses[0].id == visit.id
     assert responses[0].home_team.name == "H"
+    assert next_cursor is None
+
+
+def _visits_on(user: User, dates: list[date]) -> list[Visit]:
+    home = build_team(uuid.uuid4(), "H", "H01")
+    away = build_team(uuid.uuid4(), "A", "A01")
+    arena = build_arena(uuid.uuid4())
+    visits = []
+    for visit_date in dates:
+        visit = build_visit_with_relations(
+            visit_id=uuid.uuid4(),
+            user_id=user.id,
+            home_team=home,
+            away_team=away,
+            arena=arena,
+        )
+        visit.visit_date = visit_date
+        visits.append(visit)
+    return visits
+
+
+@pytest.mark.asyncio
+async def test_get_users_visits_returns_cursor_after_last_row_of_full_page(user: User) -> None:
+    visits = _visits_on(user, [date(2024, 3, 1), date(2024, 2, 1), date(2024, 1, 1)])
+    list_result = MagicMock()
+    list_result.all.return_value = [_row(v, total=3) for v in visits]
+    db = AsyncMock(spec=AsyncSession)
+    db.execute = AsyncMock(return_value=list_result)
+
+    responses, _, next_cursor = await visits_service.get_users_visits(user, db, skip=0, limit=2)
+
+    assert [r.id for r in responses] == [v.id for v in visits[:2]]
+    assert visits_service.decode_visit_cursor(next_cursor) == (date(2024, 2, 1), visits[1].id)
+    list_stmt = db.execute.await_args.args[0]
+    assert list_stmt._limit_clause.value == 3
+
+
+@pytest.mark.asyncio
+async def test_get_users_visits_with_cursor_uses_keyset_predicate(user: User) -> None:
+    list_result = MagicMock()
+    list_result.all.return_value = []
+    db = AsyncMock(spec=AsyncSession)
+    db.execute = AsyncMock(return_value=list_result)
+    cursor = visits_service.encode_visit_cursor(date(2024, 2, 1), uuid.uuid4())
+
+    _, total, _ = await visits_service.get_users_visits(
+        user, db, skip=0, limit=2, cursor=cursor, include_total=False
+    )
+
+    assert total is None
+    db.execute.assert_awaited_once()
+    sql = str(db.execute.await_args.args[0])
+    assert "count(*)" not in sql
+    assert "visits.visit_date < :visit_date_1" in sql
+    assert "visits.id > :id_1" in sql
+    assert "ORDER BY visits.visit_date DESC, visits.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_users_visits_counts_separately_only_past_the_end(user: User) -> None:
+    empty_page = MagicMock()
+    empty_page.all.return_value = []
+    count_result = MagicMock()
+    count_result.scalar_one.return_value = 4
+    db = AsyncMock(spec=AsyncSession)
+    db.execute = AsyncMock(side_effect=[empty_page, empty_page, count_result])
+
+    _, first_page_total, _ = await visits_service.get_users_visits(user, db, skip=0, limit=20)
+    _, past_end_total, _ = await visits_service.get_users_visits(user, db, skip=40, limit=20)
+
+    assert (first_page_total, past_end_total) == (0, 4)
+    assert db.execute.await_count == 3
+
+
+def test_decode_visit_cursor_rejects_garbage() -> None:
+    with pytest.raises(ValidationError, match="Invalid cursor"):
+        visits_service.decode_visit_cursor("not-a-cursor")
 
 
 @pytest.mark.asyncio
@@ -71,7 +198,7 @@ async def test_get_visit_by_id_for_user_returns_response(user: User) -> None:
         arena=arena,
     )
     exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = visit
+    exec_result.one_or_none.return_value = _row(visit)
     db.execute = AsyncMock(return_value=exec_result)
 
     out = await visits_service.get_visit_by_id_for_user(vid, user, db)
@@ -84,7 +211,7 @@ async def test_get_visit_by_id_for_user_returns_response(user: User) -> None:
 async def test_get_visit_by_id_for_user_raises_when_missing(user: User) -> None:
     db = AsyncMock(spec=AsyncSession)
     exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = None
+    exec_result.one_or_none.return_value = None
     db.execute = AsyncMock(return_value=exec_result)
 
     with pytest.raises(VisitNotFoundError):
@@ -92,8 +219,11 @@ async def test_get_visit_by_id_for_user_raises_when_missing(user: User) -> None:
 
 
 @pytest.mark.asyncio
+@patch("app.services.visits.apply_visit_stats_delta", new_callable=AsyncMock)
 @patch("app.services.visits.save", new_callable=AsyncMock)
-async def test_create_new_visit_success(mock_save: AsyncMock, user: User) -> None:
+async def test_create_new_visit_success(
+    mock_save: AsyncMock, mock_stats: AsyncMock, user: User, reference: list
+) -> None:
     db = AsyncMock(spec=AsyncSession)
     home_id = uuid.uuid4()
     away_id = uuid.uuid4()
@@ -102,15 +232,19 @@ async def test_create_new_visit_success(mock_save: AsyncMock, user: User) -> Non
     away = build_team(away_id, "Away", "AWY")
     arena = build_arena(arena_id, "The Barn")
 
-    async def save_impl(entity: Visit, session: AsyncSession) -> Visit:
+    calls = []
+
+    async def flush_impl() -> None:
+        calls.append("flush")
+        entity = db.add.call_args.args[0]
         entity.id = uuid.uuid4()
         entity.created_at = datetime.now(timezone.utc)
         entity.updated_at = entity.created_at
-        return entity
 
-    mock_save.side_effect = save_impl
-
-    db.get = AsyncMock(side_effect=[home, away, arena])
+    db.flush.side_effect = flush_impl
+    mock_stats.side_effect = lambda *args, **kwargs: calls.append("stats")
+    mock_save.side_effect = lambda entity, session: calls.append("save") or entity
+    reference.extend([home, away, arena])
 
     payload = VisitCreate(
         home_team_id=home_id,
@@ -127,20 +261,26 @@ async def test_create_new_visit_success(mock_save: AsyncMock, user: User) -> Non
     assert result.arena.id == arena_id
     assert result.visit_date == date(2024, 2, 1)
     assert result.seating_location == "302"
-    mock_save.assert_awaited_once()
+    assert calls == ["flush", "stats", "save"]
+    mock_stats.assert_awaited_once_with(
+        db, user.id, added=[VisitKeys(arena_id, home_id, away_id)]
+    )
+    db.get.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_create_new_visit_raises_when_home_team_missing(user: User) -> None:
+async def test_create_new_visit_raises_when_home_team_missing(
+    user: User, reference: list
+) -> None:
     db = AsyncMock(spec=AsyncSession)
     away = build_team(uuid.uuid4())
     arena = build_arena(uuid.uuid4())
-    db.get = AsyncMock(side_effect=[None, away, arena])
+    reference.extend([away, arena])
 
     payload = VisitCreate(
         home_team_id=uuid.uuid4(),
-        away_team_id=uuid.uuid4(),
-        arena_id=uuid.uuid4(),
+        away_team_id=away.id,
+        arena_id=arena.id,
         visit_date=date(2024, 2, 1),
     )
 
@@ -149,16 +289,18 @@ async def test_create_new_visit_raises_when_home_team_missing(user: User) -> Non
 
 
 @pytest.mark.asyncio
-async def test_create_new_visit_raises_when_away_team_missing(user: User) -> None:
+async def test_create_new_visit_raises_when_away_team_missing(
+    user: User, reference: list
+) -> None:
     db = AsyncMock(spec=AsyncSession)
     home = build_team(uuid.uuid4())
     arena = build_arena(uuid.uuid4())
-    db.get = AsyncMock(side_effect=[home, None, arena])
+    reference.extend([home, arena])
 
     payload = VisitCreate(
         home_team_id=home.id,
         away_team_id=uuid.uuid4(),
-        arena_id=uuid.uuid4(),
+        arena_id=arena.id,
         visit_date=date(2024, 2, 1),
     )
 
@@ -167,11 +309,13 @@ async def test_create_new_visit_raises_when_away_team_missing(user: User) -> Non
 
 
 @pytest.mark.asyncio
-async def test_create_new_visit_raises_when_arena_missing(user: User) -> None:
+async def test_create_new_visit_raises_when_arena_missing(
+    user: User, reference: list
+) -> None:
     db = AsyncMock(spec=AsyncSession)
     home = build_team(uuid.uuid4())
     away = build_team(uuid.uuid4())
-    db.get = AsyncMock(side_effect=[home, away, None])
+    reference.extend([home, away])
 
     payload = VisitCreate(
         home_team_id=home.id,
@@ -184,66 +328,104 @@ async def test_create_new_visit_raises_when_arena_missing(user: User) -> None:
         await visits_service.create_new_visit(payload, user, db)
 
 
+def _visit_for_update(user: User, **overrides) -> Visit:
+    return build_visit_with_relations(
+        visit_id=uuid.uuid4(),
+        user_id=user.id,
+        home_team=build_team(uuid.uuid4()),
+        away_team=build_team(uuid.uuid4()),
+        arena=build_arena(uuid.uuid4()),
+        **overrides,
+    )
+
+
+def _returning(row) -> MagicMock:
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    return result
+
+
 @pytest.mark.asyncio
 async def test_update_visit_for_user_empty_patch_returns_without_commit(
     user: User,
 ) -> None:
     db = AsyncMock(spec=AsyncSession)
-    home = build_team(uuid.uuid4())
-    away = build_team(uuid.uuid4())
-    arena = build_arena(uuid.uuid4())
-    vid = uuid.uuid4()
-    visit = build_visit_with_relations(
-        visit_id=vid,
-        user_id=user.id,
-        home_team=home,
-        away_team=away,
-        arena=arena,
-    )
-    exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = visit
-    db.execute = AsyncMock(return_value=exec_result)
+    visit = _visit_for_update(user)
+    db.execute = AsyncMock(return_value=_returning(_row(visit)))
 
-    out = await visits_service.update_visit_for_user(vid, VisitUpdate(), user, db)
+    out = await visits_service.update_visit_for_user(visit.id, VisitUpdate(), user, db)
 
     assert out.seating_location == visit.seating_location
+    assert str(db.execute.await_args.args[0]).startswith("SELECT")
     db.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_update_visit_for_user_applies_patch_and_commits(user: User) -> None:
+@patch("app.services.visits.apply_visit_stats_delta", new_callable=AsyncMock)
+async def test_update_visit_for_user_is_one_scoped_update(
+    mock_stats: AsyncMock, user: User
+) -> None:
     db = AsyncMock(spec=AsyncSession)
-    home = build_team(uuid.uuid4())
-    away = build_team(uuid.uuid4())
-    arena = build_arena(uuid.uuid4())
-    vid = uuid.uuid4()
-    visit = build_visit_with_relations(
-        visit_id=vid,
-        user_id=user.id,
-        home_team=home,
-        away_team=away,
-        arena=arena,
-        seating_location="100",
+    visit = _visit_for_update(user, seating_location="100")
+    visit.seating_location = "Club"
+    db.execute = AsyncMock(return_value=_returning(_row(visit)))
+
+    out = await visits_service.update_visit_for_user(
+        visit.id, VisitUpdate(seating_location="Club"), user, db
     )
-    exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = visit
-    db.execute = AsyncMock(return_value=exec_result)
 
-    payload = VisitUpdate(seating_location="Club")
+    db.execute.assert_awaited_once()
+    sql = str(db.execute.await_args.args[0])
+    assert sql.startswith("UPDATE visits SET seating_location=")
+    assert "WHERE visits.id = :id_1 AND visits.user_id = :user_id_1" in sql
+    assert "RETURNING visits.id" in sql
+    assert "FOR UPDATE" not in sql
+    db.commit.assert_awaited_once()
+    mock_stats.assert_not_awaited()
+    assert out.id == visit.id
+    assert out.seating_location == "Club"
 
-    out = await visits_service.update_visit_for_user(vid, payload, user, db)
 
+@pytest.mark.asyncio
+@patch("app.services.visits.apply_visit_stats_delta", new_callable=AsyncMock)
+async def test_update_visit_for_user_moves_stats_when_keys_change(
+    mock_stats: AsyncMock, user: User, reference: list
+) -> None:
+    db = AsyncMock(spec=AsyncSession)
+    visit = _visit_for_update(user)
+    old_arena_id = visit.arena_id
+    new_arena = build_arena(uuid.uuid4())
+    reference.append(new_arena)
+    visit.arena_id = new_arena.id
+    row = _row(
+        visit,
+        old_arena_id=old_arena_id,
+        old_home_team_id=visit.home_team_id,
+        old_away_team_id=visit.away_team_id,
+    )
+    db.execute = AsyncMock(return_value=_returning(row))
+
+    out = await visits_service.update_visit_for_user(
+        visit.id, VisitUpdate(arena_id=new_arena.id), user, db
+    )
+
+    sql = str(db.execute.await_args.args[0])
+    assert sql.startswith('WITH "old" AS')
+    assert "FOR UPDATE" in sql
+    mock_stats.assert_awaited_once_with(
+        db,
+        user.id,
+        added=[VisitKeys(new_arena.id, visit.home_team_id, visit.away_team_id)],
+        removed=[VisitKeys(old_arena_id, visit.home_team_id, visit.away_team_id)],
+    )
     db.commit.assert_awaited_once()
-    assert visit.seating_location == "Club"
-    assert out.seating_location == "Club"
+    assert out.arena.id == new_arena.id
 
 
 @pytest.mark.asyncio
 async def test_update_visit_for_user_raises_visit_not_found(user: User) -> None:
     db = AsyncMock(spec=AsyncSession)
-    exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = None
-    db.execute = AsyncMock(return_value=exec_result)
+    db.execute = AsyncMock(return_value=_returning(None))
 
     with pytest.raises(VisitNotFoundError):
         await visits_service.update_visit_for_user(
@@ -252,6 +434,7 @@ async def test_update_visit_for_user_raises_visit_not_found(user: User) -> None:
             user,
             db,
         )
+    db.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -259,80 +442,57 @@ async def test_update_visit_for_user_raises_when_patch_home_team_missing(
     user: User,
 ) -> None:
     db = AsyncMock(spec=AsyncSession)
-    home = build_team(uuid.uuid4())
-    away = build_team(uuid.uuid4())
-    arena = build_arena(uuid.uuid4())
-    vid = uuid.uuid4()
-    visit = build_visit_with_relations(
-        visit_id=vid,
-        user_id=user.id,
-        home_team=home,
-        away_team=away,
-        arena=arena,
-    )
-    exec_result = MagicMock()
-    exec_result.scalar_one_or_none.return_value = visit
-    db.execute = AsyncMock(return_value=exec_result)
-    new_team_id = uuid.uuid4()
-    db.get = AsyncMock(return_value=None)
 
-    payload = VisitUpdate(home_team_id=new_team_id)
+    payload = VisitUpdate(home_team_id=uuid.uuid4())
 
     with pytest.raises(ResourceNotFoundError, match="Home team"):
-        await visits_service.update_visit_for_user(vid, payload, user, db)
+        await visits_service.update_visit_for_user(uuid.uuid4(), payload, user, db)
+    db.execute.assert_not_awaited()
+
+
+def _delete_result(row) -> MagicMock:
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    return result
 
 
 @pytest.mark.asyncio
-@patch("app.services.visits.delete", new_callable=AsyncMock)
-async def test_delete_visit_by_id_calls_delete(
-    mock_delete: AsyncMock, user: User
+@patch("app.services.visits.apply_visit_stats_delta", new_callable=AsyncMock)
+async def test_delete_visit_by_id_deletes_visit_before_stats(
+    mock_stats: AsyncMock, user: User
 ) -> None:
     db = AsyncMock(spec=AsyncSession)
-    vid = uuid.uuid4()
-    visit = Visit(
-        id=vid,
-        user_id=user.id,
-        arena_id=uuid.uuid4(),
-        home_team_id=uuid.uuid4(),
-        away_team_id=uuid.uuid4(),
-        visit_date=date(2024, 1, 1),
-        seating_location=None,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-    )
-    db.get = AsyncMock(return_value=visit)
+    keys = VisitKeys(uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    calls = []
 
-    await visits_service.delete_visit_by_id(vid, user, db)
+    async def execute_impl(stmt):
+        calls.append(str(stmt).split()[0])
+        return _delete_result(SimpleNamespace(**keys._asdict()))
 
-    mock_delete.assert_awaited_once_with(visit, db)
+    db.execute.side_effect = execute_impl
+    mock_stats.side_effect = lambda *args, **kwargs: calls.append("stats")
+    db.commit.side_effect = lambda: calls.append("commit")
 
+    await visits_service.delete_visit_by_id(uuid.uuid4(), user, db)
 
-@pytest.mark.asyncio
-async def test_delete_visit_by_id_raises_when_visit_missing(user: User) -> None:
-    db = AsyncMock(spec=AsyncSession)
-    db.get = AsyncMock(return_value=None)
-
-    with pytest.raises(VisitNotFoundError):
-        await visits_service.delete_visit_by_id(uuid.uuid4(), user, db)
+    assert calls == ["DELETE", "stats", "commit"]
+    mock_stats.assert_awaited_once_with(db, user.id, removed=[keys])
+    db.get.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_delete_visit_by_id_raises_when_wrong_user(user: User) -> None:
+@patch("app.services.visits.apply_visit_stats_delta", new_callable=AsyncMock)
+async def test_delete_visit_by_id_is_scoped_to_the_owner(
+    mock_stats: AsyncMock, user: User
+) -> None:
     db = AsyncMock(spec=AsyncSession)
-    other_user_id = uuid.uuid4()
+    db.execute.return_value = _delete_result(None)
     vid = uuid.uuid4()
-    visit = Visit(
-        id=vid,
-        user_id=other_user_id,
-        arena_id=uuid.uuid4(),
-        home_team_id=uuid.uuid4(),
-        away_team_id=uuid.uuid4(),
-        visit_date=date(2024, 1, 1),
-        seating_location=None,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-    )
-    db.get = AsyncMock(return_value=visit)
 
     with pytest.raises(VisitNotFoundError):
         await visits_service.delete_visit_by_id(vid, user, db)
+
+    stmt = db.execute.await_args.args[0]
+    assert stmt.compile().params == {"id_1": vid, "user_id_1": user.id}
+    mock_stats.assert_not_awaited()
+    db.commit.assert_not_awaited()